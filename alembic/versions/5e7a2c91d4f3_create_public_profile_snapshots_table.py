@@ -0,0 +1,37 @@
+"""create public profile snapshots table
+
+Revision ID: 5e7a2c91d4f3
+Revises: c2f9e5f4b1d0
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e7a2c91d4f3"
+down_revision: Union[str, Sequence[str], None] = "c2f9e5f4b1d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "public_profile_snapshots",
+        sa.Column("username", sa.String(length=80), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("document", sa.Text(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("username"),
+    )
+    op.create_index(op.f("ix_public_profile_snapshots_user_id"), "public_profile_snapshots", ["user_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_public_profile_snapshots_user_id"), table_name="public_profile_snapshots")
+    op.drop_table("public_profile_snapshots")
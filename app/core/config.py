@@ -11,17 +11,66 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 0.5
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    REDIS_POOL_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 1.0
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 3
+    REDIS_BREAKER_BACKOFF_SECONDS: float = 1.0
+    REDIS_BREAKER_MAX_BACKOFF_SECONDS: float = 60.0
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = 'HS256'
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     REFREH_TOKEN_EXPIRE_DAYS: int = 7
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_LOCAL_CACHE_TTL_SECONDS: int = 5
     PUBLIC_PROFILE_CACHE_TTL_SECONDS: int = 300
+    PUBLIC_PROFILE_CACHE_STALE_SECONDS: int = 3600
+    PUBLIC_PROFILE_NEGATIVE_CACHE_TTL_SECONDS: int = 30
+    PUBLIC_USERNAME_ID_CACHE_TTL_SECONDS: int = 86400
+    PUBLIC_USERNAME_FILTER_ENABLED: bool = True
+    PUBLIC_USERNAME_FILTER_ERROR_RATE: float = 0.01
+    PUBLIC_USERNAME_FILTER_SINGLE_HOST: bool = False
+    PUBLIC_PROFILE_WARMUP_ON_STARTUP: bool = True
+    PUBLIC_PROFILE_WARMUP_INTERVAL_SECONDS: int = 0
+    PUBLIC_PROFILE_WARMUP_TOP_N: int = 100
+    PUBLIC_PROFILE_WARMUP_USERNAMES: list[str] = []
+    PUBLIC_PROFILE_WARMUP_CONCURRENCY: int = 4
+    PUBLIC_PROFILE_WARMUP_LOOKBACK_HOURS: int = 24
+    PUBLIC_PROFILE_HITS_FLUSH_SECONDS: int = 60
+    PUBLIC_EXPORT_DIR: str = "public_export"
+    PUBLIC_PROFILE_SINGLE_QUERY: bool = True
+    PUBLIC_PROFILE_LOCAL_CACHE_TTL_SECONDS: int = 5
+    LOCAL_CACHE_MAX_ENTRIES: int = 1000
+    MEMORY_CACHE_MAX_ENTRIES: int = 10000
+    MEMORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    MEMORY_CACHE_SWEEP_SECONDS: float = 30.0
+    SHARED_CACHE_PATH: str = ""
+    SHARED_CACHE_SLOTS: int = 4096
+    SHARED_CACHE_SLOT_BYTES: int = 16384
+    SHARED_CACHE_LOCK_STRIPES: int = 64
+    CACHE_SERIALIZER: str = "orjson"
+    CACHE_COMPRESSION: str = "zlib"
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+    PUBLIC_PROFILE_REBUILD_LOCK_SECONDS: int = 10
+    PUBLIC_PROFILE_REBUILD_WAIT_SECONDS: float = 5.0
     RATE_LIMIT_LOGIN_REQUESTS: int = 10
     RATE_LIMIT_LOGIN_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_LOGIN_ALGORITHM: str = "fixed_window"
     RATE_LIMIT_PUBLIC_REQUESTS: int = 60
     RATE_LIMIT_PUBLIC_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_PUBLIC_ALGORITHM: str = "fixed_window"
+    RATE_LIMIT_PUBLIC_RESERVE_BATCH: int = 0
+    RATE_LIMIT_USER_READ_REQUESTS: int = 300
+    RATE_LIMIT_USER_WRITE_REQUESTS: int = 60
+    RATE_LIMIT_ADMIN_READ_REQUESTS: int = 1200
+    RATE_LIMIT_ADMIN_WRITE_REQUESTS: int = 240
+    RATE_LIMIT_USER_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_USER_ALGORITHM: str = "fixed_window"
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 100000
+    RATE_LIMIT_MEMORY_LOCK_STRIPES: int = 16
 
     model_config = {
         "env_file":".env",
@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -6,6 +6,13 @@ from sqlalchemy.orm import Session
 
 from app.db.deps import get_db
 from app.models.users import User, UserRole
+from app.core.config import settings
+from app.core.redis_client import (
+    cache_bump_generation,
+    cache_get_generations,
+    cache_get_json,
+    cache_set_json,
+)
 from app.core.security import decode_token
 
 
@@ -13,12 +20,53 @@ from app.core.security import decode_token
 security = HTTPBearer()
 
 
+def user_cache_generation_key(user_id: int) -> str:
+    """Counter versioning every per-user cache key; bumped on each write."""
+    return f"gen:{user_id}"
+
+
+def principal_cache_key(user_id: int, generation: int) -> str:
+    return f"principal:{user_id}:g{generation}"
+
+
+def invalidate_principal_cache(user_id: int) -> None:
+    """Call after changing a user's role, active flag or credentials."""
+    cache_bump_generation(user_cache_generation_key(user_id))
+
+
+def _load_principal(db: Session, user_id: int) -> Optional[dict]:
+    # The fields auth decisions need, cached in L1 and Redis so the common
+    # authenticated request makes no auth query. The generation is read
+    # before the row, so a snapshot taken just before a change is stored
+    # under the generation that change orphans.
+    generation = cache_get_generations(
+        [user_cache_generation_key(user_id)], settings.PRINCIPAL_LOCAL_CACHE_TTL_SECONDS
+    )[0]
+    key = principal_cache_key(user_id, generation)
+    principal = cache_get_json(key, settings.PRINCIPAL_LOCAL_CACHE_TTL_SECONDS)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+        principal = {
+            "id": user.id,
+            "role": user.role,
+            "is_active": user.is_active,
+            "is_deleted": user.is_deleted,
+        }
+        cache_set_json(key, principal, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    return principal
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Extract and validate JWT, then return current user.
+
+    The user is a transient User holding only id, role and status flags;
+    routes that need the full row use get_current_user_record.
     """
 
     token = credentials.credentials
@@ -45,23 +93,42 @@ def get_current_user(
             detail="Invalid token payload"
         )
 
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.is_deleted == False
-    ).first()
+    principal = _load_principal(db, user_id)
 
-    if not user:
+    if not principal or principal["is_deleted"]:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
 
-    if not user.is_active:
+    if not principal["is_active"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is disabled"
         )
 
+    return User(**principal)
+
+
+def get_current_user_record(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Current user loaded from the database, for routes that need more than
+    get_current_user's principal.
+    """
+    user = db.query(User).filter(
+        User.id == current_user.id,
+        User.is_deleted == False
+    ).first()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
     return user
 
 
@@ -1,44 +1,357 @@
+import math
+import struct
+import threading
 import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
 
-from fastapi import HTTPException, Request, status
+from fastapi import HTTPException, Request, Response, status
 
 from app.core.config import settings
-from app.core.redis_client import get_redis_client
+from app.core.redis_client import (
+    REDIS_ERRORS,
+    get_async_redis_client,
+    get_redis_client,
+    get_shared_store,
+    record_redis_failure,
+    record_redis_success,
+)
+from app.core.security import decode_token
+from app.models.users import UserRole
+
+# Every algorithm answers a hit with (allowed, remaining hits, reset
+# seconds). Reset is the retry-after of a denied hit, and otherwise the
+# time until the window ends (gcra: until the budget is whole again).
+#
+# fixed_window: a counter that resets every window. Cheap, but a client
+# can send twice the limit across a boundary.
+# sliding_window: the current and previous window counts, the previous
+# one weighted by how much of it still overlaps the sliding window.
+# gcra: one timestamp per client (the theoretical arrival time); allows
+# bursts of up to the limit, then one request per window / limit.
+#
+# A hit can cost more than one request (a batch of profiles); it is
+# admitted only if the whole cost fits, and a denied hit costs nothing.
+# Costs above the limit never fit and are rejected before any algorithm.
+#
+# Redis scripts read the clock with TIME so every worker uses the same one.
+
+_FIXED_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local cost = tonumber(ARGV[3])
+local ttl = redis.call('ttl', KEYS[1])
+if tonumber(redis.call('get', KEYS[1]) or 0) + cost > limit then
+    return {0, 0, ttl < 0 and tonumber(ARGV[2]) or ttl}
+end
+local count = redis.call('incrby', KEYS[1], cost)
+if ttl < 0 then
+    redis.call('expire', KEYS[1], ARGV[2])
+    ttl = tonumber(ARGV[2])
+end
+return {1, limit - count, ttl}
+"""
+
+_SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('time')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local start = math.floor(now / window) * window
+
+local state = redis.call('hmget', KEYS[1], 'start', 'current', 'previous')
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if tonumber(state[1]) ~= start then
+    if tonumber(state[1]) == start - window then
+        previous = current
+    else
+        previous = 0
+    end
+    current = 0
+end
+
+local estimate = previous * (1 - (now - start) / window) + current + cost
+if estimate <= limit then
+    redis.call('hset', KEYS[1], 'start', start, 'current', current + cost, 'previous', previous)
+    redis.call('expire', KEYS[1], 2 * window)
+    return {1, math.floor(limit - estimate), math.ceil(start + window - now)}
+end
+
+local retry_at
+if current + cost > limit then
+    retry_at = start + window + window * math.max(0, 1 - (limit - cost) / current)
+else
+    retry_at = start + window * (1 - (limit - cost - current) / previous)
+end
+return {0, 0, math.max(1, math.ceil(retry_at - now))}
+"""
+
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[2]) * 1000 / tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000
+local cost = tonumber(ARGV[3])
+local clock = redis.call('time')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local tat = math.max(tonumber(redis.call('get', KEYS[1]) or 0), now)
+local allow_at = tat + cost * interval - window
+if allow_at > now then
+    return {0, 0, math.max(1, math.ceil((allow_at - now) / 1000))}
+end
+tat = tat + cost * interval
+redis.call('set', KEYS[1], string.format('%.3f', tat), 'PX', math.ceil(tat - now))
+return {1, math.floor((window - (tat - now)) / interval), math.ceil((tat - now) / 1000)}
+"""
+
+# Takes up to ARGV[3] hits of a fixed window at once, for a worker to spend
+# locally. Counts on the same key as _FIXED_WINDOW_SCRIPT.
+_RESERVE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local used = tonumber(redis.call('get', KEYS[1]) or 0)
+local granted = math.min(tonumber(ARGV[3]), limit - used)
+if granted > 0 then
+    redis.call('incrby', KEYS[1], granted)
+end
+local ttl = redis.call('ttl', KEYS[1])
+if ttl < 0 then
+    redis.call('expire', KEYS[1], ARGV[2])
+    ttl = tonumber(ARGV[2])
+end
+return {math.max(granted, 0), math.max(limit - used - granted, 0), ttl}
+"""
+
+_SCRIPTS = {
+    "reserve": _RESERVE_SCRIPT,
+    "fixed_window": _FIXED_WINDOW_SCRIPT,
+    "sliding_window": _SLIDING_WINDOW_SCRIPT,
+    "gcra": _GCRA_SCRIPT,
+}
+# Registered once per algorithm; each call passes its client and runs
+# EVALSHA, loading the script on NOSCRIPT.
+_registered_scripts: dict = {}
+_registered_scripts_async: dict = {}
+
+
+def _fixed_window_step(state: Optional[tuple], now: float, limit: int, window_seconds: int, cost: int = 1):
+    count, reset_at = state if state and now < state[1] else (0, now + window_seconds)
+    reset = max(1, math.ceil(reset_at - now))
+    if count + cost > limit:
+        return (count, reset_at), reset_at - now, (False, 0, reset)
+    count += cost
+    return (count, reset_at), reset_at - now, (True, limit - count, reset)
+
+
+def _sliding_window_step(state: Optional[tuple], now: float, limit: int, window_seconds: int, cost: int = 1):
+    start = math.floor(now / window_seconds) * window_seconds
+    stored_start, current, previous = state or (-1.0, 0, 0)
+    if stored_start != start:
+        previous = current if stored_start == start - window_seconds else 0
+        current = 0
+
+    estimate = previous * (1 - (now - start) / window_seconds) + current + cost
+    if estimate <= limit:
+        result = (True, math.floor(limit - estimate), math.ceil(start + window_seconds - now))
+        return (start, current + cost, previous), 2 * window_seconds, result
+
+    # When the estimate drops below the limit again.
+    if current + cost > limit:
+        retry_at = start + window_seconds + window_seconds * max(0.0, 1 - (limit - cost) / current)
+    else:
+        retry_at = start + window_seconds * (1 - (limit - cost - current) / previous)
+    return (start, current, previous), 2 * window_seconds, (False, 0, max(1, math.ceil(retry_at - now)))
+
 
-_memory_counters: dict[str, tuple[int, float]] = {}
+def _gcra_step(state: Optional[tuple], now: float, limit: int, window_seconds: int, cost: int = 1):
+    interval = window_seconds / limit
+    tat = max(state[0] if state else 0.0, now)
+    allow_at = tat + cost * interval - window_seconds
+    if allow_at > now:
+        return (tat,), tat - now, (False, 0, max(1, math.ceil(allow_at - now)))
+    tat += cost * interval
+    return (tat,), tat - now, (True, math.floor((window_seconds - (tat - now)) / interval), math.ceil(tat - now))
 
 
-def _hit_with_memory(key: str, window_seconds: int) -> tuple[int, int]:
+# Per algorithm: the layout of its state in the shared store, and the step.
+_MEMORY_ALGORITHMS = {
+    "fixed_window": (struct.Struct("<qd"), _fixed_window_step),  # count, reset at
+    "sliding_window": (struct.Struct("<dqq"), _sliding_window_step),  # window start, current, previous
+    "gcra": (struct.Struct("<d"), _gcra_step),  # theoretical arrival time
+}
+ALGORITHMS = tuple(_MEMORY_ALGORITHMS)
+
+
+class _MemoryCounters:
+    """
+    Per-process limiter state: `stripes` LRU tables, each with its own lock,
+    bounded to `max_keys` in total. An entry expires once idle for its TTL.
+    """
+
+    def __init__(self, max_keys: int, stripes: int):
+        self.stripes = [(threading.Lock(), OrderedDict()) for _ in range(max(1, stripes))]
+        self.max_keys_per_stripe = max(1, max_keys // len(self.stripes))
+
+    def update(self, key: str, step, now: float):
+        lock, entries = self.stripes[hash(key) % len(self.stripes)]
+        with lock:
+            expires_at, state = entries.pop(key, (0.0, None))
+            state, ttl_seconds, result = step(state if expires_at > now else None)
+            entries[key] = (now + ttl_seconds, state)
+            # Least recently hit first: drop idle keys, then any over the bound.
+            while entries:
+                oldest_expires_at, _ = next(iter(entries.values()))
+                if oldest_expires_at > now and len(entries) <= self.max_keys_per_stripe:
+                    break
+                entries.popitem(last=False)
+            return result
+
+    def __len__(self) -> int:
+        return sum(len(entries) for _, entries in self.stripes)
+
+
+_memory_counters = _MemoryCounters(settings.RATE_LIMIT_MEMORY_MAX_KEYS, settings.RATE_LIMIT_MEMORY_LOCK_STRIPES)
+# Hits reserved from Redis and not spent yet: (tokens, window reset at).
+_local_buckets = _MemoryCounters(settings.RATE_LIMIT_MEMORY_MAX_KEYS, settings.RATE_LIMIT_MEMORY_LOCK_STRIPES)
+
+
+def _hit_with_memory(algorithm: str, key: str, limit: int, window_seconds: int, cost: int = 1) -> tuple[bool, int, int]:
+    layout, step = _MEMORY_ALGORITHMS[algorithm]
     now = time.time()
-    count, reset_at = _memory_counters.get(key, (0, now + window_seconds))
-    if now >= reset_at:
-        count = 0
-        reset_at = now + window_seconds
-    count += 1
-    _memory_counters[key] = (count, reset_at)
-    retry_after = max(1, int(reset_at - now))
-    return count, retry_after
+    store = get_shared_store()
+    if store is not None:
+        # Counted once for every worker on the host, not once per worker.
+        def hit(raw):
+            state, ttl_seconds, result = step(layout.unpack(raw) if raw else None, now, limit, window_seconds, cost)
+            return layout.pack(*state), ttl_seconds, result
 
+        return store.update(key, hit)
 
-def _hit_with_redis(key: str, window_seconds: int) -> tuple[int, int]:
+    return _memory_counters.update(key, lambda state: step(state, now, limit, window_seconds, cost), now)
+
+
+def _hit_with_redis(algorithm: str, key: str, limit: int, window_seconds: int, cost: int = 1) -> tuple[bool, int, int]:
     client = get_redis_client()
     if not client:
-        return _hit_with_memory(key, window_seconds)
+        return _hit_with_memory(algorithm, key, limit, window_seconds, cost)
+
+    try:
+        script = _registered_scripts.get(algorithm)
+        if script is None:
+            script = _registered_scripts[algorithm] = client.register_script(_SCRIPTS[algorithm])
+        allowed, remaining, reset = script(keys=[key], args=[limit, window_seconds, cost], client=client)
+    except REDIS_ERRORS:
+        record_redis_failure()
+        return _hit_with_memory(algorithm, key, limit, window_seconds, cost)
+    record_redis_success()
+    return bool(allowed), int(remaining), int(reset)
+
+
+async def _hit_with_redis_async(
+    algorithm: str, key: str, limit: int, window_seconds: int, cost: int = 1
+) -> tuple[bool, int, int]:
+    client = await get_async_redis_client()
+    if not client:
+        return _hit_with_memory(algorithm, key, limit, window_seconds, cost)
+
+    try:
+        script = _registered_scripts_async.get(algorithm)
+        if script is None:
+            script = _registered_scripts_async[algorithm] = client.register_script(_SCRIPTS[algorithm])
+        allowed, remaining, reset = await script(keys=[key], args=[limit, window_seconds, cost], client=client)
+    except REDIS_ERRORS:
+        record_redis_failure()
+        return _hit_with_memory(algorithm, key, limit, window_seconds, cost)
+    record_redis_success()
+    return bool(allowed), int(remaining), int(reset)
+
 
-    count = client.incr(key)
-    if count == 1:
-        client.expire(key, window_seconds)
-    ttl = client.ttl(key)
-    retry_after = ttl if ttl and ttl > 0 else window_seconds
-    return count, retry_after
+def _take_local_token(key: str, now: float) -> Optional[tuple[int, float]]:
+    # (tokens left, reset at) after taking one, or None if there was none.
+    def take(state):
+        if state and state[0] > 0 and now < state[1]:
+            return (state[0] - 1, state[1]), state[1] - now, (state[0] - 1, state[1])
+        return (0, now), 0.0, None
 
+    return _local_buckets.update(key, take, now)
 
-def rate_limit(scope: str, max_requests: int, window_seconds: int):
-    def dependency(request: Request) -> None:
+
+def _add_local_tokens(key: str, tokens: int, reset_at: float, now: float) -> None:
+    def add(state):
+        held = state[0] if state and now < state[1] else 0
+        return (held + tokens, reset_at), reset_at - now, None
+
+    _local_buckets.update(key, add, now)
+
+
+async def _hit_with_reservation_async(key: str, limit: int, window_seconds: int, batch: int) -> tuple[bool, int, int]:
+    """
+    Fixed window where each worker reserves `batch` hits from Redis at a
+    time and spends them without network I/O. Never admits more than the
+    limit; a worker can hold up to batch - 1 unspent hits per client until
+    the window resets.
+    """
+    now = time.time()
+    taken = _take_local_token(key, now)
+    if taken is not None:
+        # Only what this worker holds; others may hold more.
+        return True, taken[0], max(1, math.ceil(taken[1] - now))
+
+    client = await get_async_redis_client()
+    if not client:
+        return _hit_with_memory("fixed_window", key, limit, window_seconds)
+
+    try:
+        script = _registered_scripts_async.get("reserve")
+        if script is None:
+            script = _registered_scripts_async["reserve"] = client.register_script(_SCRIPTS["reserve"])
+        granted, remaining, ttl = await script(keys=[key], args=[limit, window_seconds, batch], client=client)
+    except REDIS_ERRORS:
+        record_redis_failure()
+        return _hit_with_memory("fixed_window", key, limit, window_seconds)
+    record_redis_success()
+    if not granted:
+        return False, 0, max(1, int(ttl))
+    if granted > 1:
+        _add_local_tokens(key, int(granted) - 1, now + int(ttl), now)
+    return True, int(remaining) + int(granted) - 1, max(1, int(ttl))
+
+
+def rate_limit(
+    scope: str,
+    max_requests: int,
+    window_seconds: int,
+    algorithm: str = "fixed_window",
+    reserve_batch: int = 0,
+    cost: Optional[Callable[[Request], Awaitable[int]]] = None,
+):
+    """
+    `cost` returns how many requests of the budget a request spends; by
+    default each spends one.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown rate limit algorithm for {scope}: {algorithm}")
+    if reserve_batch > 1 and algorithm != "fixed_window":
+        raise ValueError(f"Reserving hits in batches needs the fixed_window algorithm: {scope}")
+
+    # Async so the check awaits Redis on the event loop instead of taking
+    # a threadpool slot before the route even runs.
+    async def dependency(request: Request) -> None:
         ip = request.client.host if request.client else "unknown"
-        key = f"rl:{scope}:{ip}"
-        count, retry_after = _hit_with_redis(key, window_seconds)
-        if count > max_requests:
+        # The algorithm is part of the key, as each keeps a different state.
+        key = f"rl:{scope}:{algorithm}:{ip}"
+        hits = await cost(request) if cost else 1
+        if hits > max_requests:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Request costs {hits} hits, over the {scope} limit of {max_requests} per window",
+            )
+        if reserve_batch > 1 and hits == 1:
+            allowed, _, retry_after = await _hit_with_reservation_async(key, max_requests, window_seconds, reserve_batch)
+        else:
+            # With reserve_batch, the counter reservations take from, so
+            # both spend one budget.
+            allowed, _, retry_after = await _hit_with_redis_async(algorithm, key, max_requests, window_seconds, hits)
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Rate limit exceeded for {scope}",
@@ -48,14 +361,89 @@ def rate_limit(scope: str, max_requests: int, window_seconds: int):
     return dependency
 
 
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def user_rate_limit(tiers: dict[str, tuple[int, int]], window_seconds: int, algorithm: str = "fixed_window"):
+    """
+    Per-user quotas with separate read and write budgets, keyed on the access
+    token's user_id and sized by its role (`tiers`: role -> (read, write)
+    requests per window). Requests without a valid access token are keyed
+    on the client IP with the user tier; the route itself still rejects them.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown rate limit algorithm for user quotas: {algorithm}")
+
+    async def dependency(request: Request, response: Response) -> None:
+        # Read from the token only, so the check needs no database query.
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        payload = decode_token(token) if scheme.lower() == "bearer" and token else None
+        if payload and payload.get("type") == "access" and payload.get("user_id") is not None:
+            subject = f"user:{payload['user_id']}"
+            read_limit, write_limit = tiers.get(payload.get("role"), tiers[UserRole.USER])
+        else:
+            subject = f"ip:{request.client.host if request.client else 'unknown'}"
+            read_limit, write_limit = tiers[UserRole.USER]
+
+        budget, limit = ("read", read_limit) if request.method in _READ_METHODS else ("write", write_limit)
+        key = f"rl:user_{budget}:{algorithm}:{subject}"
+        allowed, remaining, reset = await _hit_with_redis_async(algorithm, key, limit, window_seconds)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset),
+        }
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded for {budget} requests",
+                headers={**headers, "Retry-After": str(reset)},
+            )
+        response.headers.update(headers)
+
+    return dependency
+
+
 limit_login = rate_limit(
     "auth_login",
     settings.RATE_LIMIT_LOGIN_REQUESTS,
     settings.RATE_LIMIT_LOGIN_WINDOW_SECONDS,
+    settings.RATE_LIMIT_LOGIN_ALGORITHM,
 )
 
 limit_public = rate_limit(
     "public_profile",
     settings.RATE_LIMIT_PUBLIC_REQUESTS,
     settings.RATE_LIMIT_PUBLIC_WINDOW_SECONDS,
+    settings.RATE_LIMIT_PUBLIC_ALGORITHM,
+    settings.RATE_LIMIT_PUBLIC_RESERVE_BATCH,
+)
+
+async def _requested_profiles(request: Request) -> int:
+    # One hit per username in a batch; the route validates the body itself.
+    try:
+        usernames = (await request.json()).get("usernames")
+    except (ValueError, AttributeError):
+        return 1
+    return max(1, len(usernames)) if isinstance(usernames, list) else 1
+
+
+# Same scope and key as limit_public: a batch spends the single-profile
+# budget once per profile it asks for.
+limit_public_batch = rate_limit(
+    "public_profile",
+    settings.RATE_LIMIT_PUBLIC_REQUESTS,
+    settings.RATE_LIMIT_PUBLIC_WINDOW_SECONDS,
+    settings.RATE_LIMIT_PUBLIC_ALGORITHM,
+    settings.RATE_LIMIT_PUBLIC_RESERVE_BATCH,
+    cost=_requested_profiles,
+)
+
+limit_user = user_rate_limit(
+    {
+        UserRole.USER: (settings.RATE_LIMIT_USER_READ_REQUESTS, settings.RATE_LIMIT_USER_WRITE_REQUESTS),
+        UserRole.ADMIN: (settings.RATE_LIMIT_ADMIN_READ_REQUESTS, settings.RATE_LIMIT_ADMIN_WRITE_REQUESTS),
+    },
+    settings.RATE_LIMIT_USER_WINDOW_SECONDS,
+    settings.RATE_LIMIT_USER_ALGORITHM,
 )
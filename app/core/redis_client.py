@@ -1,64 +1,921 @@
+import asyncio
 import json
+import struct
+import threading
 import time
-from typing import Any, Optional
+import weakref
+import zlib
+from uuid import uuid4
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Optional
 
 from app.core.config import settings
+from app.core.memory_cache import MemoryCache
+from app.core.shared_store import SharedMemoryStore
 
 try:
     import redis
+    from redis import asyncio as aioredis
 except ImportError:  # pragma: no cover
     redis = None
+    aioredis = None
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Encoded values start with a header byte, 0x80 | serializer << 4 | compression,
+# so the codec can change without flushing the cache. Values written before
+# the header existed are JSON text, whose first byte is always below 0x80.
+CODEC_HEADER = 0x80
+CODEC_SERIALIZERS = {"json": 1, "orjson": 1, "msgpack": 2}
+CODEC_COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2}
 
 _redis_client = None
-_memory_cache: dict[str, tuple[float, str]] = {}
+# One asyncio client per event loop; their connections belong to it.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+# Fallback store while Redis is unavailable; expired entries are also
+# dropped by the sweeper thread, not only when read.
+_memory_cache = MemoryCache(settings.MEMORY_CACHE_MAX_ENTRIES, settings.MEMORY_CACHE_MAX_BYTES)
+_memory_sweeper: Optional[threading.Thread] = None
+_memory_sweeper_stop = threading.Event()
+_memory_scores: dict[str, tuple[float, Counter]] = {}
+_memory_generations: dict[str, int] = {}
+# With SHARED_CACHE_PATH set, the fallback lives in a file mapped by every
+# worker on the host, so they share entries, generations and rate-limit
+# counters; values too large for a slot stay in the per-process LRU.
+_shared_store: Optional[SharedMemoryStore] = None
+_shared_store_lock = threading.Lock()
+_shared_store_opened = False
+
+# L1: decoded values kept per process in front of Redis. Entries are evicted
+# on every worker through CACHE_INVALIDATION_CHANNEL.
+_local_cache: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+_local_lock = threading.Lock()
+_local_generation = 0
+
+_cache_stats = {
+    "l1_hits": 0,
+    "l1_misses": 0,
+    "l2_hits": 0,
+    "l2_misses": 0,
+    "invalidations_received": 0,
+}
+
+# Circuit breaker in front of Redis. After REDIS_BREAKER_FAILURE_THRESHOLD
+# consecutive failures (or a failed connect) it opens and every call takes
+# the local path without touching the network. Once the backoff elapses a
+# single caller probes with PING (half-open); failure doubles the backoff
+# up to REDIS_BREAKER_MAX_BACKOFF_SECONDS, success closes the breaker.
+REDIS_ERRORS = (redis.ConnectionError, redis.TimeoutError) if redis is not None else ()
+
+_breaker_lock = threading.Lock()
+_breaker = {
+    "state": "closed",
+    "consecutive_failures": 0,
+    "backoff_seconds": 0.0,
+    "open_until": 0.0,
+    "probing": False,
+}
+_breaker_stats = {
+    "failures": 0,
+    "opened": 0,
+    "short_circuited": 0,
+}
+
+_channel_handlers: dict[str, Callable[[str], None]] = {}
+_subscribe_hooks: list[Callable[[], None]] = []
+_listener_thread: Optional[threading.Thread] = None
+_listener_stop = threading.Event()
+_listener_subscribed = False
+
+
+def _pool_options() -> dict:
+    return {
+        "max_connections": settings.REDIS_POOL_MAX_CONNECTIONS,
+        "timeout": settings.REDIS_POOL_TIMEOUT_SECONDS,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    }
 
 
 def get_redis_client():
+    """The shared Redis client, or None while Redis is unavailable."""
     global _redis_client
-    if _redis_client is not None:
-        return _redis_client
     if redis is None:
         return None
-    try:
-        _redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
-        _redis_client.ping()
+    if _breaker["state"] == "closed" and _redis_client is not None:
         return _redis_client
+    if not _breaker_allows():
+        return None
+
+    try:
+        client = _redis_client or redis.Redis(
+            connection_pool=redis.BlockingConnectionPool.from_url(settings.REDIS_URL, **_pool_options())
+        )
+        client.ping()
     except Exception:
-        _redis_client = None
+        record_redis_failure(connect=True)
+        return None
+    # Publish only a verified client; concurrent callers must never see
+    # one that has not answered PING.
+    _redis_client = client
+    record_redis_success()
+    return _redis_client
+
+
+async def get_async_redis_client():
+    """
+    The redis.asyncio client of the running event loop, on a bounded
+    pool, or None while Redis is unavailable. Shares the breaker with
+    the sync client; callers report the outcome of each call.
+    """
+    if aioredis is None:
         return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            connection_pool=aioredis.BlockingConnectionPool.from_url(settings.REDIS_URL, **_pool_options())
+        )
+        _async_clients[loop] = client
+    if _breaker["state"] == "closed":
+        return client
+    if not _breaker_allows():
+        return None
+
+    # Half-open: settle the probe here with a PING, like the sync client,
+    # so an error the caller does not handle cannot leave it pending.
+    try:
+        await client.ping()
+    except asyncio.CancelledError:
+        record_redis_failure(connect=True)
+        raise
+    except Exception:
+        record_redis_failure(connect=True)
+        return None
+    record_redis_success()
+    return client
+
+
+async def close_async_redis_client() -> None:
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _breaker_allows() -> bool:
+    # Closed: go ahead. Open: no, until the backoff elapsed, then exactly
+    # one caller goes through as the half-open probe.
+    if _breaker["state"] == "closed":
+        return True
+    with _breaker_lock:
+        if _breaker["probing"] or time.time() < _breaker["open_until"]:
+            _breaker_stats["short_circuited"] += 1
+            return False
+        _breaker["state"] = "half_open"
+        _breaker["probing"] = True
+        return True
+
+
+def record_redis_success() -> None:
+    if _breaker["state"] == "closed" and not _breaker["consecutive_failures"]:
+        return
+    with _breaker_lock:
+        _breaker.update(state="closed", consecutive_failures=0, backoff_seconds=0.0, probing=False)
+
+
+def record_redis_failure(connect: bool = False) -> None:
+    """Count a failed Redis call; opens the breaker once failures pile up."""
+    with _breaker_lock:
+        _breaker_stats["failures"] += 1
+        _breaker["consecutive_failures"] += 1
+        if not (
+            connect
+            or _breaker["state"] == "half_open"
+            or _breaker["consecutive_failures"] >= settings.REDIS_BREAKER_FAILURE_THRESHOLD
+        ):
+            return
+        if _breaker["state"] == "open" and not _breaker["probing"]:
+            return
+        backoff = min(
+            max(_breaker["backoff_seconds"] * 2, settings.REDIS_BREAKER_BACKOFF_SECONDS),
+            settings.REDIS_BREAKER_MAX_BACKOFF_SECONDS,
+        )
+        _breaker.update(
+            state="open",
+            backoff_seconds=backoff,
+            open_until=time.time() + backoff,
+            probing=False,
+        )
+        _breaker_stats["opened"] += 1
+
+
+def _breaker_snapshot() -> dict:
+    with _breaker_lock:
+        return {
+            "state": _breaker["state"],
+            "consecutive_failures": _breaker["consecutive_failures"],
+            "backoff_seconds": _breaker["backoff_seconds"],
+            "retry_in_seconds": round(max(0.0, _breaker["open_until"] - time.time()), 3)
+            if _breaker["state"] == "open" else 0.0,
+            **_breaker_stats,
+        }
+
+
+def _count(name: str) -> None:
+    _cache_stats[name] += 1
+
+
+def _serialize(value: Any, serializer: str) -> tuple[int, bytes]:
+    if serializer == "msgpack" and msgpack is not None:
+        return CODEC_SERIALIZERS["msgpack"], msgpack.packb(value, default=str, use_bin_type=True)
+    if serializer != "json" and orjson is not None:
+        return CODEC_SERIALIZERS["json"], orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return CODEC_SERIALIZERS["json"], json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _compress(data: bytes, compression: str) -> tuple[int, bytes]:
+    if compression == "none" or len(data) < settings.CACHE_COMPRESSION_MIN_BYTES:
+        return CODEC_COMPRESSIONS["none"], data
+    if compression == "zstd" and zstandard is not None:
+        packed = CODEC_COMPRESSIONS["zstd"], zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        packed = CODEC_COMPRESSIONS["zlib"], zlib.compress(data, 6)
+    return packed if len(packed[1]) < len(data) else (CODEC_COMPRESSIONS["none"], data)
+
+
+def encode_cache_value(value: Any, serializer: Optional[str] = None, compression: Optional[str] = None) -> bytes:
+    """
+    Encode a value for storage with the configured (or given) codec.
+    Codecs whose library is not installed fall back to json / zlib.
+    """
+    serializer_id, data = _serialize(value, serializer or settings.CACHE_SERIALIZER)
+    compression_id, data = _compress(data, compression or settings.CACHE_COMPRESSION)
+    return bytes((CODEC_HEADER | serializer_id << 4 | compression_id,)) + data
+
 
+def decode_cache_value(raw: bytes) -> Any:
+    """Decode a stored value; raises ValueError if its codec is unavailable here."""
+    if raw[0] < CODEC_HEADER:
+        return json.loads(raw)
 
-def cache_get_json(key: str) -> Optional[Any]:
+    serializer_id, compression_id = raw[0] >> 4 & 0x07, raw[0] & 0x0F
+    data = memoryview(raw)[1:]
+    if compression_id == CODEC_COMPRESSIONS["zlib"]:
+        data = zlib.decompress(data)
+    elif compression_id == CODEC_COMPRESSIONS["zstd"] and zstandard is not None:
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif compression_id != CODEC_COMPRESSIONS["none"]:
+        raise ValueError(f"Unsupported cache compression {compression_id}")
+
+    if serializer_id == CODEC_SERIALIZERS["json"]:
+        return orjson.loads(data) if orjson is not None else json.loads(bytes(data))
+    if serializer_id == CODEC_SERIALIZERS["msgpack"] and msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    raise ValueError(f"Unsupported cache serializer {serializer_id}")
+
+
+# What a truncated or corrupt entry raises while decoding. JSON decode
+# errors and msgpack's unpack errors subclass ValueError.
+_DECODE_ERRORS = (ValueError, IndexError, zlib.error) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def _decode(raw: bytes) -> Optional[Any]:
+    # Entries another worker wrote with a codec missing here, and corrupt
+    # entries, read as misses.
+    try:
+        return decode_cache_value(raw)
+    except _DECODE_ERRORS:
+        return None
+
+
+def _local_get(key: str) -> Optional[Any]:
+    with _local_lock:
+        data = _local_cache.get(key)
+        if not data:
+            return None
+        expires_at, value = data
+        if expires_at < time.time():
+            _local_cache.pop(key, None)
+            return None
+        _local_cache.move_to_end(key)
+        return value
+
+
+def _local_set(key: str, value: Any, ttl_seconds: int, generation: Optional[int] = None) -> None:
+    with _local_lock:
+        # A value read before an invalidation arrived must not be stored.
+        if generation is not None and generation != _local_generation:
+            return
+        _local_cache[key] = (time.time() + ttl_seconds, value)
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > settings.LOCAL_CACHE_MAX_ENTRIES:
+            _local_cache.popitem(last=False)
+
+
+def _local_evict(key: str) -> None:
+    global _local_generation
+    with _local_lock:
+        _local_generation += 1
+        _local_cache.pop(key, None)
+
+
+def _local_clear() -> None:
+    global _local_generation
+    with _local_lock:
+        _local_generation += 1
+        _local_cache.clear()
+
+
+def _from_l1(key: str, local_ttl_seconds: int) -> Optional[Any]:
+    if not local_ttl_seconds:
+        return None
+    value = _local_get(key)
+    _count("l1_hits" if value is not None else "l1_misses")
+    return value
+
+
+def _from_l2(key: str, raw: Optional[bytes], local_ttl_seconds: int, generation: int) -> Optional[Any]:
+    value = _decode(raw) if raw else None
+    if value is None:
+        _count("l2_misses")
+        return None
+    _count("l2_hits")
+    if local_ttl_seconds:
+        _local_set(key, value, local_ttl_seconds, generation)
+    return value
+
+
+def cache_get_json(key: str, local_ttl_seconds: int = 0) -> Optional[Any]:
     client = get_redis_client()
     if client:
-        raw = client.get(key)
-        return json.loads(raw) if raw else None
+        value = _from_l1(key, local_ttl_seconds)
+        if value is not None:
+            return value
 
-    now = time.time()
-    data = _memory_cache.get(key)
-    if not data:
-        return None
-    expires_at, payload = data
-    if expires_at < now:
-        _memory_cache.pop(key, None)
+        generation = _local_generation
+        try:
+            raw = client.get(key)
+        except REDIS_ERRORS:
+            record_redis_failure()
+            return _memory_get(key)
+        record_redis_success()
+        return _from_l2(key, raw, local_ttl_seconds, generation)
+
+    return _memory_get(key)
+
+
+def get_shared_store() -> Optional[SharedMemoryStore]:
+    """The host-wide fallback store, or None when not configured or unavailable."""
+    global _shared_store, _shared_store_opened
+    if _shared_store_opened:
+        return _shared_store
+    with _shared_store_lock:
+        if not _shared_store_opened and settings.SHARED_CACHE_PATH:
+            try:
+                _shared_store = SharedMemoryStore(
+                    settings.SHARED_CACHE_PATH,
+                    settings.SHARED_CACHE_SLOTS,
+                    settings.SHARED_CACHE_SLOT_BYTES,
+                    settings.SHARED_CACHE_LOCK_STRIPES,
+                )
+            except (OSError, ValueError):
+                _shared_store = None
+        _shared_store_opened = True
+    return _shared_store
+
+
+def _memory_set(key: str, payload: bytes, ttl_seconds: int) -> None:
+    store = get_shared_store()
+    if store is not None and store.set(key, payload, ttl_seconds):
+        return
+    _memory_cache.set(key, payload, ttl_seconds)
+
+
+def _memory_delete(key: str) -> None:
+    store = get_shared_store()
+    if store is not None:
+        store.delete(key)
+    _memory_cache.delete(key)
+
+
+def _memory_get(key: str) -> Optional[Any]:
+    store = get_shared_store()
+    payload = store.get(key) if store is not None else None
+    if payload is None:
+        payload = _memory_cache.get(key)
+    value = _decode(payload) if payload is not None else None
+    if value is None:
+        _count("l2_misses")
         return None
-    return json.loads(payload)
+    _count("l2_hits")
+    return value
+
+
+def cache_get_many(keys: list[str], local_ttl_seconds: int = 0) -> list[Optional[Any]]:
+    """Like cache_get_json for several keys, with one MGET for L1 misses."""
+    client = get_redis_client()
+    if not client:
+        return [_memory_get(key) for key in keys]
+
+    values = [_from_l1(key, local_ttl_seconds) for key in keys]
+    remote = [index for index, value in enumerate(values) if value is None]
+    if remote:
+        generation = _local_generation
+        try:
+            raws = client.mget([keys[index] for index in remote])
+        except REDIS_ERRORS:
+            record_redis_failure()
+            raws = None
+        else:
+            record_redis_success()
+        for position, index in enumerate(remote):
+            if raws is None:
+                values[index] = _memory_get(keys[index])
+            else:
+                values[index] = _from_l2(keys[index], raws[position], local_ttl_seconds, generation)
+    return values
 
 
 def cache_set_json(key: str, value: Any, ttl_seconds: int) -> None:
-    payload = json.dumps(value, default=str)
+    payload = encode_cache_value(value)
     client = get_redis_client()
     if client:
-        client.setex(key, ttl_seconds, payload)
+        try:
+            client.setex(key, ttl_seconds, payload)
+            record_redis_success()
+            return
+        except REDIS_ERRORS:
+            record_redis_failure()
+
+    _memory_set(key, payload, ttl_seconds)
+
+
+def cache_evict_local(key: str) -> None:
+    _local_evict(key)
+
+
+def cache_set_many(values: dict[str, Any], ttl_seconds: int) -> None:
+    """Like cache_set_json for several keys, with one pipelined round trip."""
+    if not values:
         return
+    payloads = {key: encode_cache_value(value) for key, value in values.items()}
+    client = get_redis_client()
+    if client:
+        pipe = client.pipeline(transaction=False)
+        for key, payload in payloads.items():
+            pipe.setex(key, ttl_seconds, payload)
+        try:
+            pipe.execute()
+            record_redis_success()
+            return
+        except REDIS_ERRORS:
+            record_redis_failure()
 
-    _memory_cache[key] = (time.time() + ttl_seconds, payload)
+    for key, payload in payloads.items():
+        _memory_set(key, payload, ttl_seconds)
 
 
 def cache_delete(key: str) -> None:
+    cache_delete_many([key])
+
+
+def cache_delete_many(keys: list[str]) -> None:
+    """Delete keys everywhere, L1 of every worker included, in one round trip."""
+    if not keys:
+        return
     client = get_redis_client()
     if client:
-        client.delete(key)
+        for key in keys:
+            _local_evict(key)
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        for key in keys:
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, key)
+        try:
+            pipe.execute()
+            record_redis_success()
+        except REDIS_ERRORS:
+            record_redis_failure()
+    for key in keys:
+        _memory_delete(key)
+
+
+def cache_add_scores(key: str, increments: dict[str, float], ttl_seconds: int) -> None:
+    """Add to the scores of members of a sorted set (ZINCRBY)."""
+    if not increments:
+        return
+    client = get_redis_client()
+    if client:
+        pipe = client.pipeline(transaction=False)
+        for member, amount in increments.items():
+            pipe.zincrby(key, amount, member)
+        pipe.expire(key, ttl_seconds)
+        try:
+            pipe.execute()
+            return
+        except REDIS_ERRORS:
+            record_redis_failure()
+
+    now = time.time()
+    expires_at, scores = _memory_scores.get(key, (now, Counter()))
+    if expires_at < now:
+        scores = Counter()
+    scores.update(increments)
+    _memory_scores[key] = (now + ttl_seconds, scores)
+
+
+def cache_top_scores(keys: list[str], limit: int) -> list[str]:
+    """Members with the highest total score across the given sorted sets."""
+    if not keys or limit <= 0:
+        return []
+    client = get_redis_client()
+    if client:
+        union_key = f"{keys[0]}:union:{uuid4().hex}"
+        pipe = client.pipeline(transaction=False)
+        pipe.zunionstore(union_key, keys)
+        pipe.zrevrange(union_key, 0, limit - 1)
+        pipe.delete(union_key)
+        try:
+            return [member.decode("utf-8") for member in pipe.execute()[1]]
+        except REDIS_ERRORS:
+            record_redis_failure()
+
+    now = time.time()
+    totals: Counter = Counter()
+    for key in keys:
+        expires_at, scores = _memory_scores.get(key, (0, Counter()))
+        if expires_at >= now:
+            totals.update(scores)
+    return [member for member, _ in totals.most_common(limit)]
+
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def cache_acquire_lock(key: str, ttl_seconds: int) -> Optional[str]:
+    """
+    Try to take a short cross-process lock. Returns a token to release it
+    with, or None if another process holds it. Without Redis the lock is
+    always granted; callers coordinate threads in-process themselves.
+    """
+    token = uuid4().hex
+    client = get_redis_client()
+    if client:
+        try:
+            if not client.set(key, token, nx=True, ex=ttl_seconds):
+                return None
+        except REDIS_ERRORS:
+            record_redis_failure()
+    return token
+
+
+def cache_release_lock(key: str, token: str) -> None:
+    client = get_redis_client()
+    if client:
+        try:
+            client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except REDIS_ERRORS:
+            # The lock expires on its own TTL.
+            record_redis_failure()
+
+
+def cache_lock_held(key: str) -> bool:
+    client = get_redis_client()
+    if not client:
+        return False
+    try:
+        return bool(client.exists(key))
+    except REDIS_ERRORS:
+        record_redis_failure()
+        return False
+
+
+# Generation counters are seeded from the clock, so a counter that was
+# evicted restarts above every value it had before instead of at 1.
+_GET_GENERATION_SCRIPT = """
+local value = redis.call('get', KEYS[1])
+if not value then
+    redis.call('set', KEYS[1], ARGV[1])
+    return ARGV[1]
+end
+return value
+"""
+
+_BUMP_GENERATION_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    redis.call('set', KEYS[1], ARGV[1])
+end
+return redis.call('incr', KEYS[1])
+"""
+
+_SHARED_GENERATION = struct.Struct("<q")
+_SHARED_GENERATION_TTL_SECONDS = 30 * 86400
+
+
+def _memory_generation(key: str, bump: bool = False) -> int:
+    store = get_shared_store()
+    if store is None:
+        if bump:
+            _memory_generations[key] = _memory_generations.get(key, 0) + 1
+        return _memory_generations.get(key, 0)
+
+    # Seeded from the clock like the Redis counters, for the same reason.
+    def advance(current: Optional[bytes]) -> tuple[bytes, float, int]:
+        value = _SHARED_GENERATION.unpack(current)[0] if current else int(time.time() * 1000)
+        value += int(bump)
+        return _SHARED_GENERATION.pack(value), _SHARED_GENERATION_TTL_SECONDS, value
+
+    return store.update(key, advance)
+
+
+def host_generation(key: str, bump: bool = False) -> int:
+    """
+    A counter shared by the workers of this host through SHARED_CACHE_PATH
+    (or private to this process without it); never touches Redis.
+    """
+    return _memory_generation(key, bump)
+
+
+def cache_get_generations(keys: list[str], local_ttl_seconds: int = 0) -> list[int]:
+    """Current values of generation counters, for versioning derived cache keys."""
+    client = get_redis_client()
+    if not client:
+        return [_memory_generation(key) for key in keys]
+
+    values: list[Optional[int]] = [_local_get(key) if local_ttl_seconds else None for key in keys]
+    remote = [index for index, value in enumerate(values) if value is None]
+    if remote:
+        generation = _local_generation
+        seed = int(time.time() * 1000)
+        pipe = client.pipeline(transaction=False)
+        for index in remote:
+            pipe.eval(_GET_GENERATION_SCRIPT, 1, keys[index], seed)
+        try:
+            results = pipe.execute()
+        except REDIS_ERRORS:
+            record_redis_failure()
+            return [_memory_generation(key) for key in keys]
+        for index, value in zip(remote, results):
+            values[index] = int(value)
+            if local_ttl_seconds:
+                _local_set(keys[index], values[index], local_ttl_seconds, generation)
+    return values
+
+
+def cache_bump_generation(key: str) -> int:
+    """
+    Advance a generation counter, which orphans every cache key built
+    from the previous value at once. Orphans expire on their own TTL.
+    """
+    client = get_redis_client()
+    if client:
+        _local_evict(key)
+        pipe = client.pipeline(transaction=False)
+        pipe.eval(_BUMP_GENERATION_SCRIPT, 1, key, int(time.time() * 1000))
+        pipe.publish(CACHE_INVALIDATION_CHANNEL, key)
+        try:
+            return int(pipe.execute()[0])
+        except REDIS_ERRORS:
+            record_redis_failure()
+
+    return _memory_generation(key, bump=True)
+
+
+def get_cache_stats() -> dict:
+    store = get_shared_store()
+    with _local_lock:
+        l1_entries = len(_local_cache)
+    return {
+        **_cache_stats,
+        "l1_entries": l1_entries,
+        "backend": "redis" if get_redis_client() else "memory",
+        "listener_running": bool(_listener_thread and _listener_thread.is_alive()),
+        "breaker": _breaker_snapshot(),
+        "memory": _memory_cache.stats(),
+        "shared": store.stats() if store is not None else None,
+    }
+
+
+def publish(channel: str, message: str) -> None:
+    client = get_redis_client()
+    if client:
+        try:
+            client.publish(channel, message)
+        except REDIS_ERRORS:
+            record_redis_failure()
+
+
+def subscribe(channel: str, handler: Callable[[str], None]) -> None:
+    """
+    Register a handler called with each message published on `channel`
+    by any process. Messages are delivered by the listener thread.
+    """
+    _channel_handlers[channel] = handler
+
+
+def on_subscribed(hook: Callable[[], None]) -> None:
+    """
+    Register a hook run each time the listener (re)subscribes, i.e. when
+    messages published while it was disconnected may have been missed.
+    """
+    _subscribe_hooks.append(hook)
+
+
+def _on_invalidation(key: str) -> None:
+    _count("invalidations_received")
+    _local_evict(key)
+
+
+subscribe(CACHE_INVALIDATION_CHANNEL, _on_invalidation)
+
+
+def _listen() -> None:
+    global _listener_subscribed
+    while not _listener_stop.is_set():
+        client = get_redis_client()
+        if not client:
+            _listener_stop.wait(5)
+            continue
+
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            subscribed: set[str] = set()
+            while not _listener_stop.is_set():
+                pending = set(_channel_handlers) - subscribed
+                if pending:
+                    pubsub.subscribe(*pending)
+                    subscribed |= pending
+                    _listener_subscribed = True
+                    # Messages may have been missed while (re)connecting.
+                    _local_clear()
+                    for hook in _subscribe_hooks:
+                        hook()
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    handler = _channel_handlers.get(message["channel"].decode("utf-8"))
+                    if handler:
+                        handler(message["data"].decode("utf-8"))
+        except Exception as exc:
+            if isinstance(exc, REDIS_ERRORS):
+                record_redis_failure()
+            _local_clear()
+            _listener_stop.wait(1)
+        finally:
+            _listener_subscribed = False
+            pubsub.close()
+
+
+def cache_listener_connected() -> bool:
+    """True while this process receives messages published by the others."""
+    return _listener_subscribed
+
+
+def start_cache_listener() -> None:
+    global _listener_thread
+    if _listener_thread and _listener_thread.is_alive():
+        return
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(target=_listen, name="cache-listener", daemon=True)
+    _listener_thread.start()
+
+
+def stop_cache_listener() -> None:
+    _listener_stop.set()
+    if _listener_thread:
+        _listener_thread.join(timeout=5)
+
+
+def _sweep_memory_cache() -> None:
+    while not _memory_sweeper_stop.wait(settings.MEMORY_CACHE_SWEEP_SECONDS):
+        _memory_cache.sweep()
+
+
+def start_memory_sweeper() -> None:
+    global _memory_sweeper
+    if _memory_sweeper and _memory_sweeper.is_alive():
         return
-    _memory_cache.pop(key, None)
+    _memory_sweeper_stop.clear()
+    _memory_sweeper = threading.Thread(target=_sweep_memory_cache, name="memory-cache-sweeper", daemon=True)
+    _memory_sweeper.start()
+
+
+def stop_memory_sweeper() -> None:
+    _memory_sweeper_stop.set()
+    if _memory_sweeper:
+        _memory_sweeper.join(timeout=5)
+
+
+# asyncio variants of the cache helpers, for async routes and
+# dependencies: same keys, codec, L1 and memory fallback as the sync ones.
+
+
+async def cache_get_json_async(key: str, local_ttl_seconds: int = 0) -> Optional[Any]:
+    client = await get_async_redis_client()
+    if client:
+        value = _from_l1(key, local_ttl_seconds)
+        if value is not None:
+            return value
+
+        generation = _local_generation
+        try:
+            raw = await client.get(key)
+        except REDIS_ERRORS:
+            record_redis_failure()
+            return _memory_get(key)
+        record_redis_success()
+        return _from_l2(key, raw, local_ttl_seconds, generation)
+
+    return _memory_get(key)
+
+
+async def cache_get_many_async(keys: list[str], local_ttl_seconds: int = 0) -> list[Optional[Any]]:
+    client = await get_async_redis_client()
+    if not client:
+        return [_memory_get(key) for key in keys]
+
+    values = [_from_l1(key, local_ttl_seconds) for key in keys]
+    remote = [index for index, value in enumerate(values) if value is None]
+    if remote:
+        generation = _local_generation
+        try:
+            raws = await client.mget([keys[index] for index in remote])
+        except REDIS_ERRORS:
+            record_redis_failure()
+            raws = None
+        else:
+            record_redis_success()
+        for position, index in enumerate(remote):
+            if raws is None:
+                values[index] = _memory_get(keys[index])
+            else:
+                values[index] = _from_l2(keys[index], raws[position], local_ttl_seconds, generation)
+    return values
+
+
+async def cache_set_json_async(key: str, value: Any, ttl_seconds: int) -> None:
+    await cache_set_many_async({key: value}, ttl_seconds)
+
+
+async def cache_set_many_async(values: dict[str, Any], ttl_seconds: int) -> None:
+    if not values:
+        return
+    payloads = {key: encode_cache_value(value) for key, value in values.items()}
+    client = await get_async_redis_client()
+    if client:
+        pipe = client.pipeline(transaction=False)
+        for key, payload in payloads.items():
+            pipe.setex(key, ttl_seconds, payload)
+        try:
+            await pipe.execute()
+            record_redis_success()
+            return
+        except REDIS_ERRORS:
+            record_redis_failure()
+
+    for key, payload in payloads.items():
+        _memory_set(key, payload, ttl_seconds)
+
+
+async def cache_delete_async(key: str) -> None:
+    await cache_delete_many_async([key])
+
+
+async def cache_delete_many_async(keys: list[str]) -> None:
+    if not keys:
+        return
+    client = await get_async_redis_client()
+    if client:
+        for key in keys:
+            _local_evict(key)
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        for key in keys:
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, key)
+        try:
+            await pipe.execute()
+            record_redis_success()
+        except REDIS_ERRORS:
+            record_redis_failure()
+    for key in keys:
+        _memory_delete(key)
@@ -0,0 +1,192 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+_MAGIC = b"PFSHM001"
+_FILE_HEADER = struct.Struct("<8sIII")  # magic, slot count, slot bytes, group size
+_FILE_HEADER_BYTES = 4096
+# key hash (0 = empty), expires at, key length, value length
+_SLOT_HEADER = struct.Struct("<QdHI")
+
+GROUP_SIZE = 8
+MAX_KEY_BYTES = 256
+
+
+class SharedMemoryStore:
+    """
+    Fixed-size hash table in a memory-mapped file, shared by every process
+    on the host that opens the same path.
+
+    A key hashes to a group of GROUP_SIZE slots. Groups are guarded by
+    `stripes` locks, each a thread lock plus an fcntl byte-range lock on
+    the file, so threads and processes exclude each other alike. A full
+    group evicts its entry closest to expiry. Values larger than a slot
+    are refused.
+    """
+
+    def __init__(self, path: str, slot_count: int, slot_bytes: int, stripes: int = 64):
+        if fcntl is None:
+            raise OSError("fcntl is required for the shared store")
+        self.groups = max(1, slot_count // GROUP_SIZE)
+        self.slot_count = self.groups * GROUP_SIZE
+        self.slot_bytes = slot_bytes
+        self.max_value_bytes = slot_bytes - _SLOT_HEADER.size - MAX_KEY_BYTES
+        if self.max_value_bytes <= 0:
+            raise ValueError("slot_bytes too small")
+        self.stripes = max(1, min(stripes, self.groups))
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+        self.evictions = 0
+        self.expirations = 0
+
+        size = _FILE_HEADER_BYTES + self.slot_count * slot_bytes
+        header = _FILE_HEADER.pack(_MAGIC, self.slot_count, slot_bytes, GROUP_SIZE)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Byte 0 of the file serialises (re)initialisation between processes.
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            if os.pread(self._fd, _FILE_HEADER.size, 0) != header or os.fstat(self._fd).st_size != size:
+                # New file or another layout: start from an empty table.
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, header, 0)
+            self._map = mmap.mmap(self._fd, size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+    @contextmanager
+    def _locked(self, group: int):
+        stripe = group % self.stripes
+        with self._thread_locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 1 + stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 1 + stripe)
+
+    def _locate(self, key: str) -> Optional[tuple[bytes, int, int]]:
+        key_bytes = key.encode("utf-8")
+        if len(key_bytes) > MAX_KEY_BYTES:
+            return None
+        key_hash = int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little") or 1
+        return key_bytes, key_hash, key_hash % self.groups
+
+    def _offset(self, slot: int) -> int:
+        return _FILE_HEADER_BYTES + slot * self.slot_bytes
+
+    def _find(self, group: int, key_hash: int, key_bytes: bytes) -> tuple[Optional[int], int, bool]:
+        # Returns (slot holding a live entry for the key, slot to write it
+        # to, whether writing there evicts another live entry).
+        now = time.time()
+        free = victim = None
+        victim_expires_at = float("inf")
+        for slot in range(group * GROUP_SIZE, (group + 1) * GROUP_SIZE):
+            offset = self._offset(slot)
+            slot_hash, expires_at, key_length, _ = _SLOT_HEADER.unpack_from(self._map, offset)
+            key_start = offset + _SLOT_HEADER.size
+            if slot_hash == key_hash and self._map[key_start:key_start + key_length] == key_bytes:
+                if expires_at >= now:
+                    return slot, slot, False
+                self.expirations += 1
+                return None, slot, False
+            if slot_hash == 0 or expires_at < now:
+                if free is None:
+                    free = slot
+            elif expires_at < victim_expires_at:
+                victim, victim_expires_at = slot, expires_at
+        if free is not None:
+            return None, free, False
+        return None, victim, True
+
+    def _read(self, slot: int) -> bytes:
+        offset = self._offset(slot)
+        value_length = _SLOT_HEADER.unpack_from(self._map, offset)[3]
+        value_start = offset + _SLOT_HEADER.size + MAX_KEY_BYTES
+        return self._map[value_start:value_start + value_length]
+
+    def _write(self, slot: int, key_hash: int, key_bytes: bytes, payload: bytes, ttl_seconds: float) -> None:
+        offset = self._offset(slot)
+        key_start = offset + _SLOT_HEADER.size
+        self._map[key_start:key_start + len(key_bytes)] = key_bytes
+        value_start = key_start + MAX_KEY_BYTES
+        self._map[value_start:value_start + len(payload)] = payload
+        _SLOT_HEADER.pack_into(self._map, offset, key_hash, time.time() + ttl_seconds, len(key_bytes), len(payload))
+
+    def get(self, key: str) -> Optional[bytes]:
+        located = self._locate(key)
+        if located is None:
+            return None
+        key_bytes, key_hash, group = located
+        with self._locked(group):
+            slot, _, _ = self._find(group, key_hash, key_bytes)
+            return self._read(slot) if slot is not None else None
+
+    def set(self, key: str, payload: bytes, ttl_seconds: float) -> bool:
+        """Store a value; returns False (and drops any old value) if it does not fit."""
+        located = self._locate(key)
+        if located is None:
+            return False
+        if len(payload) > self.max_value_bytes:
+            self.delete(key)
+            return False
+        key_bytes, key_hash, group = located
+        with self._locked(group):
+            _, slot, evicts = self._find(group, key_hash, key_bytes)
+            self._write(slot, key_hash, key_bytes, payload, ttl_seconds)
+            self.evictions += evicts
+        return True
+
+    def update(self, key: str, fn: Callable[[Optional[bytes]], tuple[bytes, float, Any]]) -> Any:
+        """
+        Atomic read-modify-write across processes: `fn` gets the current
+        value (or None) and returns (new value, ttl seconds, result).
+        Returns the result.
+        """
+        located = self._locate(key)
+        if located is None:
+            raise ValueError(f"Key too long for the shared store: {key}")
+        key_bytes, key_hash, group = located
+        with self._locked(group):
+            slot, target, evicts = self._find(group, key_hash, key_bytes)
+            payload, ttl_seconds, result = fn(self._read(slot) if slot is not None else None)
+            if len(payload) > self.max_value_bytes:
+                raise ValueError(f"Value too large for the shared store: {key}")
+            self._write(target, key_hash, key_bytes, payload, ttl_seconds)
+            self.evictions += evicts
+        return result
+
+    def delete(self, key: str) -> None:
+        located = self._locate(key)
+        if located is None:
+            return
+        key_bytes, key_hash, group = located
+        with self._locked(group):
+            slot, _, _ = self._find(group, key_hash, key_bytes)
+            if slot is not None:
+                _SLOT_HEADER.pack_into(self._map, self._offset(slot), 0, 0.0, 0, 0)
+
+    def stats(self) -> dict:
+        # Unlocked scan: an approximate count is enough for metrics.
+        now = time.time()
+        entries = 0
+        for slot in range(self.slot_count):
+            slot_hash, expires_at, _, _ = _SLOT_HEADER.unpack_from(self._map, self._offset(slot))
+            if slot_hash and expires_at >= now:
+                entries += 1
+        return {
+            "entries": entries,
+            "slots": self.slot_count,
+            "slot_bytes": self.slot_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Callable, Optional, TypeVar
+
+from app.core.redis_client import cache_acquire_lock, cache_lock_held, cache_release_lock
+
+T = TypeVar("T")
+
+_POLL_INTERVAL_SECONDS = 0.05
+
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def single_flight(
+    key: str,
+    build: Callable[[], T],
+    fetch: Callable[[], Optional[T]],
+    lock_seconds: int,
+    wait_seconds: float,
+) -> T:
+    """
+    Coalesce concurrent rebuilds of `key`.
+
+    Threads of this process share one in-flight future per key. Across
+    processes a short Redis lock elects one builder; the others poll
+    `fetch` (usually a cache read) until the result appears, the lock is
+    released, or `wait_seconds` runs out, and only then build themselves.
+    Exceptions raised by the builder are re-raised in every waiter.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not leader:
+        try:
+            return future.result(timeout=wait_seconds)
+        except TimeoutError:
+            return build()
+
+    try:
+        result = _build_with_lock(key, build, fetch, lock_seconds, wait_seconds)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _build_with_lock(
+    key: str,
+    build: Callable[[], T],
+    fetch: Callable[[], Optional[T]],
+    lock_seconds: int,
+    wait_seconds: float,
+) -> T:
+    lock_key = f"lock:{key}"
+    token = cache_acquire_lock(lock_key, lock_seconds)
+    if token is None:
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(_POLL_INTERVAL_SECONDS)
+            result = fetch()
+            if result is not None:
+                return result
+            if not cache_lock_held(lock_key):
+                break
+        return build()
+
+    try:
+        # The previous holder may have finished just before we got the lock.
+        result = fetch()
+        if result is not None:
+            return result
+        return build()
+    finally:
+        cache_release_lock(lock_key, token)
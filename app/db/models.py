@@ -1,3 +1,4 @@
 from app.models.users import User
 from app.models.refresh_tokens import RefreshToken
 from app.models.portfolio import Project, Skill, Experience, ResumeFile
+from app.models.public_profile_snapshots import PublicProfileSnapshot
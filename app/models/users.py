@@ -27,3 +27,4 @@ class User(Base, BaseTable):
     skills = relationship("Skill", back_populates="user")
     experiences = relationship("Experience", back_populates="user")
     resume_files = relationship("ResumeFile", back_populates="user")
+    public_profile_snapshot = relationship("PublicProfileSnapshot", back_populates="user", uselist=False)
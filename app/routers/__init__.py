@@ -1 +1 @@
-from . import auth, portfolio, public, users
+from . import auth, metrics, portfolio, public, users
@@ -17,7 +17,7 @@ from app.services.auth_service import (
     refresh_user_token,
     logout_user,
 )
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user_record
 from app.core.rate_limit import limit_login
 from app.models.users import User
 
@@ -58,5 +58,5 @@ def logout(data: RefreshTokenRequest, db: Session = Depends(get_db)):
     return logout_user(db, data.refresh_token)
 
 @router.get("/me", response_model=AuthUserResponse, status_code=status.HTTP_200_OK)
-def current_user(current_user: User= Depends(get_current_user)):
+def current_user(current_user: User= Depends(get_current_user_record)):
     return current_user
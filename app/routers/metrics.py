@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends, status
+
+from app.core.deps import require_admin
+from app.core.redis_client import get_cache_stats
+from app.models.users import User
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+def cache_metrics(_admin_user: User = Depends(require_admin)):
+    return get_cache_stats()
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, File, Query, UploadFile, status
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_user
+from app.core.rate_limit import limit_user
 from app.db.deps import get_db
 from app.models.users import User
 from app.schemas.portfolio import (
@@ -44,7 +45,7 @@ from app.services.portfolio_service import (
     upload_resume_file,
 )
 
-router = APIRouter(prefix="/portfolio", tags=["Portfolio"])
+router = APIRouter(prefix="/portfolio", tags=["Portfolio"], dependencies=[Depends(limit_user)])
 
 
 @router.post("/projects", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
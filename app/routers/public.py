@@ -1,19 +1,75 @@
-from fastapi import APIRouter, Depends, status
+import json
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.db.deps import get_db
-from app.core.rate_limit import limit_public
-from app.schemas.public import PublicProfileResponse
-from app.services.public_service import get_public_profile
+from app.core.rate_limit import limit_public, limit_public_batch
+from app.schemas.public import (
+    PublicProfileBatchRequest,
+    PublicProfileBatchResponse,
+    PublicProfileResponse,
+    PublicProfileViewResponse,
+)
+from app.services.public_service import (
+    get_public_profile_entry,
+    get_public_profile_view_entry,
+    get_public_profiles_batch,
+)
 
 router = APIRouter(prefix="/public", tags=["Public"])
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
 @router.get(
     "/{username}",
-    response_model=PublicProfileResponse,
+    # The whole profile, or with sections/fields/limit/cursor a view of it.
+    response_model=Union[PublicProfileResponse, PublicProfileViewResponse],
     status_code=status.HTTP_200_OK,
     dependencies=[Depends(limit_public)],
+    responses={304: {"description": "Profile unchanged since the ETag in If-None-Match"}},
+)
+def get_profile(
+    username: str,
+    request: Request,
+    sections: Optional[str] = Query(default=None, description="e.g. projects,skills"),
+    fields: Optional[str] = Query(default=None, description="e.g. projects.title,projects.live_url"),
+    limit: Optional[int] = Query(default=None, ge=1, le=100, description="items per section"),
+    cursor: Optional[List[str]] = Query(default=None, description="next_cursors value, one per section"),
+    db: Session = Depends(get_db),
+):
+    if sections or fields or limit or cursor:
+        entry = get_public_profile_view_entry(db, username, sections, fields, limit, cursor)
+    else:
+        entry = get_public_profile_entry(db, username)
+    headers = {"ETag": entry["etag"], "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # The full profile body was validated against PublicProfileResponse
+    # when cached; views are built from the same columns.
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+@router.post(
+    "/batch",
+    response_model=PublicProfileBatchResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_public_batch)],
 )
-def get_profile(username: str, db: Session = Depends(get_db)):
-    return get_public_profile(db, username)
+def get_profiles_batch(payload: PublicProfileBatchRequest, db: Session = Depends(get_db)):
+    bodies, missing = get_public_profiles_batch(db, payload.usernames)
+    # Cached bodies are already validated JSON; splice them in unchanged.
+    profiles = ",".join(f"{json.dumps(username)}:{body}" for username, body in bodies.items())
+    content = f'{{"profiles":{{{profiles}}},"missing":{json.dumps(missing)}}}'
+    return Response(content=content, media_type="application/json")
@@ -3,7 +3,8 @@ from typing import Literal, Optional
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_current_user, require_admin
+from app.core.deps import get_current_user_record, require_admin
+from app.core.rate_limit import limit_user
 from app.db.deps import get_db
 from app.models.users import User, UserRole
 from app.schemas.user import (
@@ -25,12 +26,13 @@ from app.services.user_service import (
 
 router = APIRouter(
     prefix="/users",
-    tags=["Users"]
+    tags=["Users"],
+    dependencies=[Depends(limit_user)],
 )
 
 
 @router.get("/me", response_model=UserResponse, status_code=status.HTTP_200_OK)
-def me(current_user: User = Depends(get_current_user)):
+def me(current_user: User = Depends(get_current_user_record)):
     return current_user
 
 
@@ -77,7 +79,7 @@ def create_user(
 def put_change_password(
     payload: ChangePasswordRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_record),
 ):
     change_password(db, current_user, payload.old_password, payload.new_password)
     return {"message": "Password changed successfully"}
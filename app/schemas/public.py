@@ -1,7 +1,7 @@
 from datetime import date
-from typing import Optional, List
+from typing import Dict, Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PublicProjectResponse(BaseModel):
@@ -44,3 +44,52 @@ class PublicProfileResponse(BaseModel):
     projects: List[PublicProjectResponse]
     skills: List[PublicSkillResponse]
     experiences: List[PublicExperienceResponse]
+
+
+# Projected or paginated profiles (`sections`, `fields`, `limit`, `cursor`):
+# only the requested sections are present, their items carry only the
+# requested fields, and `limit` adds `next_cursors`.
+class PublicProjectView(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    repo_url: Optional[str] = None
+    live_url: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    is_featured: Optional[bool] = None
+
+
+class PublicSkillView(BaseModel):
+    name: Optional[str] = None
+    category: Optional[str] = None
+    level: Optional[str] = None
+
+
+class PublicExperienceView(BaseModel):
+    company: Optional[str] = None
+    role_title: Optional[str] = None
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    is_current: Optional[bool] = None
+
+
+class PublicProfileViewResponse(BaseModel):
+    name: Optional[str]
+    username: str
+    projects: Optional[List[PublicProjectView]] = None
+    skills: Optional[List[PublicSkillView]] = None
+    experiences: Optional[List[PublicExperienceView]] = None
+    next_cursors: Optional[Dict[str, Optional[str]]] = Field(
+        default=None,
+        description="Per returned section, the cursor of its next page (null on the last page)",
+    )
+
+
+class PublicProfileBatchRequest(BaseModel):
+    usernames: List[str] = Field(..., min_length=1, max_length=200)
+
+
+class PublicProfileBatchResponse(BaseModel):
+    profiles: Dict[str, PublicProfileResponse]
+    missing: List[str]
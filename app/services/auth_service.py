@@ -14,6 +14,7 @@ from app.core.security import (
     decode_token,
     hash_token,
 )
+from app.services.public_service import register_public_username
 from app.services.username_service import generate_unique_username
 
 
@@ -45,6 +46,7 @@ def register_user(db: Session, data):
     db.add(user)
     db.commit()
     db.refresh(user)
+    register_public_username(user.username)
 
     return {"message": "User registered successfully"}
 
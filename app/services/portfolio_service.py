@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.models.portfolio import Experience, Project, ResumeFile, Skill
 from app.models.users import User, UserRole
-from app.services.public_service import invalidate_public_profile_cache
+from app.services.public_service import invalidate_public_profile_cache, rebuild_public_profile_snapshot
 
 
 UPLOAD_DIR = Path(__file__).resolve().parents[2] / "uploads" / "resumes"
@@ -49,9 +49,10 @@ def create_project(db: Session, current_user: User, payload, user_id: Optional[i
     owner_id = _resolve_owner_id(current_user, user_id)
     project = Project(user_id=owner_id, **payload.model_dump())
     db.add(project)
+    _rebuild_public_snapshot(db, owner_id)
     db.commit()
     db.refresh(project)
-    _invalidate_public_cache_by_user_id(db, owner_id)
+    invalidate_public_profile_cache(owner_id)
     return project
 
 
@@ -82,9 +83,10 @@ def update_project(db: Session, current_user: User, project_id: int, payload) ->
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(project, key, value)
     project.modify_by = current_user.id
+    _rebuild_public_snapshot(db, project.user_id)
     db.commit()
     db.refresh(project)
-    _invalidate_public_cache_by_user_id(db, project.user_id)
+    invalidate_public_profile_cache(project.user_id)
     return project
 
 
@@ -93,8 +95,10 @@ def delete_project(db: Session, current_user: User, project_id: int):
     project.is_deleted = True
     project.deleted_by = current_user.id
     project.deleted_at = datetime.utcnow()
+    owner_id = project.user_id
+    _rebuild_public_snapshot(db, owner_id)
     db.commit()
-    _invalidate_public_cache_by_user_id(db, project.user_id)
+    invalidate_public_profile_cache(owner_id)
     return {"message": "Project deleted successfully"}
 
 
@@ -102,9 +106,10 @@ def create_skill(db: Session, current_user: User, payload, user_id: Optional[int
     owner_id = _resolve_owner_id(current_user, user_id)
     skill = Skill(user_id=owner_id, **payload.model_dump())
     db.add(skill)
+    _rebuild_public_snapshot(db, owner_id)
     db.commit()
     db.refresh(skill)
-    _invalidate_public_cache_by_user_id(db, owner_id)
+    invalidate_public_profile_cache(owner_id)
     return skill
 
 
@@ -135,9 +140,10 @@ def update_skill(db: Session, current_user: User, skill_id: int, payload) -> Ski
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(skill, key, value)
     skill.modify_by = current_user.id
+    _rebuild_public_snapshot(db, skill.user_id)
     db.commit()
     db.refresh(skill)
-    _invalidate_public_cache_by_user_id(db, skill.user_id)
+    invalidate_public_profile_cache(skill.user_id)
     return skill
 
 
@@ -146,8 +152,10 @@ def delete_skill(db: Session, current_user: User, skill_id: int):
     skill.is_deleted = True
     skill.deleted_by = current_user.id
     skill.deleted_at = datetime.utcnow()
+    owner_id = skill.user_id
+    _rebuild_public_snapshot(db, owner_id)
     db.commit()
-    _invalidate_public_cache_by_user_id(db, skill.user_id)
+    invalidate_public_profile_cache(owner_id)
     return {"message": "Skill deleted successfully"}
 
 
@@ -155,9 +163,10 @@ def create_experience(db: Session, current_user: User, payload, user_id: Optiona
     owner_id = _resolve_owner_id(current_user, user_id)
     experience = Experience(user_id=owner_id, **payload.model_dump())
     db.add(experience)
+    _rebuild_public_snapshot(db, owner_id)
     db.commit()
     db.refresh(experience)
-    _invalidate_public_cache_by_user_id(db, owner_id)
+    invalidate_public_profile_cache(owner_id)
     return experience
 
 
@@ -188,9 +197,10 @@ def update_experience(db: Session, current_user: User, experience_id: int, paylo
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(experience, key, value)
     experience.modify_by = current_user.id
+    _rebuild_public_snapshot(db, experience.user_id)
     db.commit()
     db.refresh(experience)
-    _invalidate_public_cache_by_user_id(db, experience.user_id)
+    invalidate_public_profile_cache(experience.user_id)
     return experience
 
 
@@ -199,8 +209,10 @@ def delete_experience(db: Session, current_user: User, experience_id: int):
     experience.is_deleted = True
     experience.deleted_by = current_user.id
     experience.deleted_at = datetime.utcnow()
+    owner_id = experience.user_id
+    _rebuild_public_snapshot(db, owner_id)
     db.commit()
-    _invalidate_public_cache_by_user_id(db, experience.user_id)
+    invalidate_public_profile_cache(owner_id)
     return {"message": "Experience deleted successfully"}
 
 
@@ -244,7 +256,7 @@ def upload_resume_file(
     db.add(record)
     db.commit()
     db.refresh(record)
-    _invalidate_public_cache_by_user_id(db, owner_id)
+    invalidate_public_profile_cache(owner_id)
     return record
 
 
@@ -272,16 +284,16 @@ def delete_resume_file(db: Session, current_user: User, file_id: int):
     record.deleted_by = current_user.id
     record.deleted_at = datetime.utcnow()
 
+    owner_id = record.user_id
     path = Path(record.storage_path)
     if path.exists():
         path.unlink()
 
     db.commit()
-    _invalidate_public_cache_by_user_id(db, record.user_id)
+    invalidate_public_profile_cache(owner_id)
     return {"message": "Resume file deleted successfully"}
 
 
-def _invalidate_public_cache_by_user_id(db: Session, user_id: int) -> None:
-    user = db.query(User).filter(User.id == user_id).first()
-    if user and user.username:
-        invalidate_public_profile_cache(user.username)
+def _rebuild_public_snapshot(db: Session, user_id: int) -> None:
+    db.flush()
+    rebuild_public_profile_snapshot(db, user_id)
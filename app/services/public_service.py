@@ -1,91 +1,767 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Optional
+
 from fastapi import HTTPException, status
+from sqlalchemy import Date, and_, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
 from sqlalchemy.orm import Session
 
+from app.core.bloom import BloomFilter
 from app.core.config import settings
-from app.core.redis_client import cache_delete, cache_get_json, cache_set_json
+from app.core.deps import user_cache_generation_key
+from app.core.redis_client import (
+    cache_acquire_lock,
+    cache_add_scores,
+    cache_bump_generation,
+    cache_delete,
+    cache_evict_local,
+    cache_get_json,
+    cache_get_generations,
+    cache_get_many,
+    cache_listener_connected,
+    cache_release_lock,
+    cache_set_json,
+    cache_set_many,
+    cache_top_scores,
+    host_generation,
+    on_subscribed,
+    publish,
+    subscribe,
+)
+from app.core.single_flight import single_flight
+from app.db.session import sessiolocal
 from app.models.portfolio import Experience, Project, Skill
+from app.models.public_profile_snapshots import PublicProfileSnapshot
 from app.models.users import User
+from app.schemas.public import PublicProfileResponse
 
 
-def public_profile_cache_key(username: str) -> str:
-    return f"public_profile:{username.lower()}"
+PROJECT_FIELDS = ("title", "description", "repo_url", "live_url", "start_date", "end_date", "is_featured")
+SKILL_FIELDS = ("name", "category", "level")
+EXPERIENCE_FIELDS = ("company", "role_title", "description", "start_date", "end_date", "is_current")
 
+PUBLIC_SECTIONS = {
+    "projects": (Project, PROJECT_FIELDS, (Project.is_featured.desc(), Project.id.desc())),
+    "skills": (Skill, SKILL_FIELDS, (Skill.name.asc(),)),
+    "experiences": (Experience, EXPERIENCE_FIELDS, (Experience.start_date.desc(), Experience.id.desc())),
+}
 
-def invalidate_public_profile_cache(username: str) -> None:
-    cache_delete(public_profile_cache_key(username))
+# Keyset pagination order of each section: (column, descending).
+PUBLIC_SECTION_KEYS = {
+    "projects": ((Project.is_featured, True), (Project.id, True)),
+    "skills": ((Skill.name, False), (Skill.id, False)),
+    "experiences": ((Experience.start_date, True), (Experience.id, True)),
+}
 
+USERNAME_ADDED_CHANNEL = "usernames:added"
+USERNAMES_ADDED_GENERATION_KEY = "gen:usernames:added"
+PUBLIC_PROFILE_HITS_KEY = "public_profile:hits"
 
-def get_public_profile(db: Session, username: str):
-    cache_key = public_profile_cache_key(username)
-    cached = cache_get_json(cache_key)
-    if cached:
-        return cached
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="public-profile-refresh")
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+
+# Every username ever registered, lowercased. Usernames added by other
+# workers arrive over USERNAME_ADDED_CHANNEL, so the filter is only trusted
+# while the cache listener is connected. With
+# PUBLIC_USERNAME_FILTER_SINGLE_HOST, every registration also bumps a host
+# counter instead, and the filter is trusted while that counter is still
+# the one it has seen (no Redis needed).
+_username_filter: Optional[BloomFilter] = None
+_username_filter_generation = 0
+_username_filter_pending: Optional[list[str]] = None
+_username_filter_lock = threading.Lock()
+_username_filter_rebuild = threading.Lock()
+
+# Per-process hit counts, flushed into hourly Redis buckets by
+# flush_public_profile_hits() and used to rank profiles for warm-up.
+_profile_hits: Counter = Counter()
+_profile_hits_lock = threading.Lock()
+
+
+def public_username_key(username: str) -> str:
+    return f"public_profile:{username.lower()}:user"
+
+
+def public_profile_cache_key(username: str, generation: int) -> str:
+    return f"public_profile:{username.lower()}:g{generation}"
+
+
+def invalidate_public_profile_cache(user_id: int) -> None:
+    """Orphan the cached profile and every cached view of a user at once."""
+    cache_bump_generation(user_cache_generation_key(user_id))
+
+
+def _remember_username(username: str) -> None:
+    with _username_filter_lock:
+        if _username_filter is not None:
+            _username_filter.add(username.lower())
+        if _username_filter_pending is not None:
+            _username_filter_pending.append(username.lower())
+
+
+def register_public_username(username: str) -> None:
+    """
+    Make a newly created username visible to public lookups on every
+    worker and drop any cached "not found" result for it.
+    """
+    global _username_filter_generation
+    _remember_username(username)
+    generation = host_generation(USERNAMES_ADDED_GENERATION_KEY, bump=True)
+    with _username_filter_lock:
+        # Only this registration since the filter last caught up.
+        if generation == _username_filter_generation + 1:
+            _username_filter_generation = generation
+    publish(USERNAME_ADDED_CHANNEL, username)
+    cache_delete(public_username_key(username))
+
+
+def rebuild_username_filter() -> None:
+    global _username_filter, _username_filter_generation, _username_filter_pending
+    if not _username_filter_rebuild.acquire(blocking=False):
+        return
+    try:
+        with _username_filter_lock:
+            _username_filter_pending = []
+        # Read before the table: later registrations elsewhere move it on.
+        generation = host_generation(USERNAMES_ADDED_GENERATION_KEY)
+
+        db = sessiolocal()
+        try:
+            count = db.query(func.count(User.id)).scalar() or 0
+            bloom = BloomFilter(max(count * 2, 10_000), settings.PUBLIC_USERNAME_FILTER_ERROR_RATE)
+            for (username,) in db.query(User.username).yield_per(5000):
+                bloom.add(username.lower())
+        finally:
+            db.close()
+
+        # Usernames added while the table was being read.
+        with _username_filter_lock:
+            for username in _username_filter_pending:
+                bloom.add(username)
+            _username_filter = bloom
+            _username_filter_generation = generation
+    finally:
+        with _username_filter_lock:
+            _username_filter_pending = None
+        _username_filter_rebuild.release()
+
+
+def _schedule_username_filter_rebuild() -> None:
+    global _username_filter
+    if not settings.PUBLIC_USERNAME_FILTER_ENABLED:
+        return
+    # Additions may have been missed; stop trusting the old filter.
+    _username_filter = None
+    _refresh_executor.submit(rebuild_username_filter)
+
+
+def start_username_filter() -> None:
+    """Build the username filter at startup unless it waits for the cache listener."""
+    if settings.PUBLIC_USERNAME_FILTER_SINGLE_HOST:
+        _schedule_username_filter_rebuild()
+
+
+def _username_filter_trusted() -> bool:
+    if not settings.PUBLIC_USERNAME_FILTER_SINGLE_HOST:
+        return cache_listener_connected()
+    if host_generation(USERNAMES_ADDED_GENERATION_KEY) == _username_filter_generation:
+        return True
+    # Another worker registered a username.
+    _schedule_username_filter_rebuild()
+    return False
+
+
+def _username_may_exist(username: str) -> bool:
+    bloom = _username_filter
+    if bloom is None or not _username_filter_trusted():
+        return True
+    return username.lower() in bloom
+
+
+subscribe(USERNAME_ADDED_CHANNEL, _remember_username)
+on_subscribed(_schedule_username_filter_rebuild)
+
+
+def _hits_bucket_key(hour: int) -> str:
+    return f"{PUBLIC_PROFILE_HITS_KEY}:{hour}"
+
+
+def _record_hit(username: str) -> None:
+    with _profile_hits_lock:
+        _profile_hits[username.lower()] += 1
+
+
+def flush_public_profile_hits() -> None:
+    global _profile_hits
+    with _profile_hits_lock:
+        hits, _profile_hits = _profile_hits, Counter()
+    lookback_seconds = settings.PUBLIC_PROFILE_WARMUP_LOOKBACK_HOURS * 3600
+    cache_add_scores(_hits_bucket_key(int(time.time() // 3600)), hits, lookback_seconds + 3600)
+
+
+def top_public_usernames(limit: int) -> list[str]:
+    """Most requested usernames over the last PUBLIC_PROFILE_WARMUP_LOOKBACK_HOURS."""
+    current_hour = int(time.time() // 3600)
+    keys = [
+        _hits_bucket_key(current_hour - offset)
+        for offset in range(settings.PUBLIC_PROFILE_WARMUP_LOOKBACK_HOURS)
+    ]
+    return cache_top_scores(keys, limit)
 
-    user = db.query(User).filter(
-        User.username == username,
+
+def _public_user_filters(usernames: list[str]):
+    return (
+        User.username.in_(usernames),
         User.is_active == True,
         User.is_deleted == False,
-    ).first()
+    )
+
+
+def _load_public_profiles_multi_query(db: Session, usernames: list[str]) -> dict[str, dict]:
+    users = db.query(User).filter(*_public_user_filters(usernames)).all()
+    if not users:
+        return {}
+
+    profiles = {
+        user.id: {"name": user.name, "username": user.username, **{section: [] for section in PUBLIC_SECTIONS}}
+        for user in users
+    }
+    for section, (model, fields, order_by) in PUBLIC_SECTIONS.items():
+        items = db.query(model).filter(
+            model.user_id.in_(list(profiles)),
+            model.is_deleted == False,
+            model.is_active == True,
+        ).order_by(*order_by).all()
+        for item in items:
+            profiles[item.user_id][section].append({field: getattr(item, field) for field in fields})
+    return {profile["username"]: profile for profile in profiles.values()}
+
+
+def _json_section_subquery(model, fields, order_by):
+    row = func.json_build_object(
+        *[part for field in fields for part in (literal_column(f"'{field}'"), getattr(model, field))]
+    )
+    return (
+        select(func.coalesce(
+            func.json_agg(aggregate_order_by(row, *order_by)),
+            literal_column("'[]'::json"),
+            type_=JSON,
+        ))
+        .where(
+            model.user_id == User.id,
+            model.is_deleted == False,
+            model.is_active == True,
+        )
+        .scalar_subquery()
+    )
+
+
+def _load_public_profiles_single_query(db: Session, usernames: list[str]) -> dict[str, dict]:
+    # One round trip: the sections are aggregated to JSON by Postgres as
+    # correlated subqueries of each user row.
+    statement = select(
+        User.name,
+        User.username,
+        *[
+            _json_section_subquery(model, fields, order_by).label(section)
+            for section, (model, fields, order_by) in PUBLIC_SECTIONS.items()
+        ],
+    ).where(*_public_user_filters(usernames))
+
+    return {row["username"]: dict(row) for row in db.execute(statement).mappings()}
+
+
+def load_public_profiles(db: Session, usernames: list[str]) -> dict[str, dict]:
+    """Build the public profiles of existing active users, keyed by username."""
+    if not usernames:
+        return {}
+    if settings.PUBLIC_PROFILE_SINGLE_QUERY and db.get_bind().dialect.name == "postgresql":
+        return _load_public_profiles_single_query(db, usernames)
+    return _load_public_profiles_multi_query(db, usernames)
+
+
+def load_public_profile(db: Session, username: str) -> Optional[dict]:
+    return load_public_profiles(db, [username]).get(username)
+
 
+def rebuild_public_profile_snapshot(db: Session, user_id: int) -> Optional[str]:
+    """
+    Re-render the stored public profile of a user inside the caller's
+    transaction. Pending changes must be flushed first. Returns the username.
+    """
+    # Row lock serialises concurrent rebuilds of the same user.
+    user = db.query(User).filter(User.id == user_id).with_for_update().first()
     if not user:
+        return None
+
+    snapshot = db.query(PublicProfileSnapshot).filter(
+        PublicProfileSnapshot.user_id == user.id
+    ).first()
+    profile = load_public_profile(db, user.username)
+
+    if profile is None:
+        if snapshot:
+            db.delete(snapshot)
+        return user.username
+
+    document = json.dumps(profile, default=str)
+    if snapshot:
+        snapshot.username = user.username
+        snapshot.document = document
+        snapshot.version += 1
+        snapshot.updated_at = datetime.utcnow()
+    else:
+        db.add(PublicProfileSnapshot(
+            username=user.username,
+            user_id=user.id,
+            document=document,
+            version=1,
+            updated_at=datetime.utcnow(),
+        ))
+    return user.username
+
+
+def _load_public_profile_document(db: Session, username: str) -> Optional[str]:
+    snapshot = db.get(PublicProfileSnapshot, username)
+    if snapshot:
+        return snapshot.document
+
+    # Profiles not edited since snapshots were introduced are backfilled
+    # on first read.
+    user_id = db.query(User.id).filter(*_public_user_filters([username])).scalar()
+    if user_id is None:
+        return None
+    rebuild_public_profile_snapshot(db, user_id)
+    db.commit()
+
+    snapshot = db.get(PublicProfileSnapshot, username)
+    return snapshot.document if snapshot else None
+
+
+def load_public_profile_documents(db: Session, usernames: list[str]) -> dict[str, str]:
+    """
+    Profile documents of existing active users, keyed by username: read
+    from snapshots, or built with set-based queries where none exists.
+    """
+    documents = {
+        snapshot.username: snapshot.document
+        for snapshot in db.query(PublicProfileSnapshot).filter(PublicProfileSnapshot.username.in_(usernames))
+    }
+    unsnapshotted = [username for username in usernames if username not in documents]
+    for username, profile in load_public_profiles(db, unsnapshotted).items():
+        documents[username] = json.dumps(profile, default=str)
+    return documents
+
+
+def public_profile_etag(body: str) -> str:
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _raise_profile_not_found():
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Profile not found"
+    )
+
+
+def render_public_profile_body(document: str) -> str:
+    """Validate a profile document against PublicProfileResponse and serialize it."""
+    return PublicProfileResponse.model_validate_json(document).model_dump_json()
+
+
+def _public_profile_entry(document: str) -> dict:
+    # Validated and serialized once here; hits send `body` as is.
+    body = render_public_profile_body(document)
+    return {
+        "fresh_until": time.time() + settings.PUBLIC_PROFILE_CACHE_TTL_SECONDS,
+        "etag": public_profile_etag(body),
+        "body": body,
+    }
+
+
+def _cache_public_profile(cache_key: str, document: str) -> dict:
+    # The entry stays servable (stale) for PUBLIC_PROFILE_CACHE_STALE_SECONDS
+    # after it stops being fresh.
+    entry = _public_profile_entry(document)
+    cache_set_json(
+        cache_key,
+        entry,
+        settings.PUBLIC_PROFILE_CACHE_TTL_SECONDS + settings.PUBLIC_PROFILE_CACHE_STALE_SECONDS,
+    )
+    return entry
+
+
+def _cache_public_profiles(db: Session, keys: dict[str, str]) -> dict[str, str]:
+    """
+    Build and cache the profiles of `keys` (username -> cache key) with
+    set-based queries and one multi-set per outcome. Returns the body of
+    each found username; the others are cached as missing.
+    """
+    documents = load_public_profile_documents(db, list(keys))
+    entries = {username: _public_profile_entry(documents[username]) for username in keys if username in documents}
+    cache_set_many(
+        {keys[username]: entry for username, entry in entries.items()},
+        settings.PUBLIC_PROFILE_CACHE_TTL_SECONDS + settings.PUBLIC_PROFILE_CACHE_STALE_SECONDS,
+    )
+    cache_set_many(
+        {cache_key: {"missing": True} for username, cache_key in keys.items() if username not in entries},
+        settings.PUBLIC_PROFILE_NEGATIVE_CACHE_TTL_SECONDS,
+    )
+    return {username: entry["body"] for username, entry in entries.items()}
+
+
+def _cache_public_profile_missing(cache_key: str) -> None:
+    cache_set_json(cache_key, {"missing": True}, settings.PUBLIC_PROFILE_NEGATIVE_CACHE_TTL_SECONDS)
+
+
+def _build_public_profile(db: Session, username: str, cache_key: str) -> dict:
+    document = _load_public_profile_document(db, username)
+    if document is None:
+        _cache_public_profile_missing(cache_key)
+        _raise_profile_not_found()
+    return _cache_public_profile(cache_key, document)
+
+
+def _refresh_public_profile(username: str, cache_key: str) -> None:
+    try:
+        # Another worker may already have refreshed the shared entry.
+        entry = cache_get_json(cache_key)
+        if entry and entry["fresh_until"] > time.time():
+            cache_evict_local(cache_key)
+            return
+
+        lock_key = f"refresh:{cache_key}"
+        token = cache_acquire_lock(lock_key, settings.PUBLIC_PROFILE_REBUILD_LOCK_SECONDS)
+        if token is None:
+            return
+        db = sessiolocal()
+        try:
+            _build_public_profile(db, username, cache_key)
+        finally:
+            db.close()
+            cache_release_lock(lock_key, token)
+    except Exception:
+        # A failed refresh leaves the stale entry; the next request retries.
+        pass
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+
+
+def _schedule_refresh(username: str, cache_key: str) -> None:
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+    _refresh_executor.submit(_refresh_public_profile, username, cache_key)
+
+
+def _canonical_username(username: str) -> str:
+    # Usernames are stored lowercase and cache keys are lowercased; lookups
+    # must match, or another casing would cache the profile as missing.
+    return username.lower()
+
+
+def get_public_profile_entry(db: Session, username: str) -> dict:
+    """
+    Return the cache entry for a public profile: `body` (the serialized
+    PublicProfileResponse), its `etag` and `fresh_until`.
+    """
+    username = _canonical_username(username)
+    if not _username_may_exist(username):
+        _raise_profile_not_found()
+
+    cache_key = _public_profile_cache_keys(db, [username]).get(username)
+    if cache_key is None:
+        _raise_profile_not_found()
+    entry = cache_get_json(cache_key, settings.PUBLIC_PROFILE_LOCAL_CACHE_TTL_SECONDS)
+    if entry and entry.get("missing"):
+        _raise_profile_not_found()
+    # Entries written by older releases lack the envelope fields.
+    if entry and "body" in entry:
+        if entry["fresh_until"] <= time.time():
+            _schedule_refresh(username, cache_key)
+        _record_hit(username)
+        return entry
+
+    entry = single_flight(
+        cache_key,
+        build=lambda: _build_public_profile(db, username, cache_key),
+        fetch=lambda: cache_get_json(cache_key),
+        lock_seconds=settings.PUBLIC_PROFILE_REBUILD_LOCK_SECONDS,
+        wait_seconds=settings.PUBLIC_PROFILE_REBUILD_WAIT_SECONDS,
+    )
+    if entry.get("missing"):
+        _raise_profile_not_found()
+    _record_hit(username)
+    return entry
+
+
+def _resolve_public_user_ids(db: Session, usernames: list[str]) -> dict[str, int]:
+    # Usernames never change, so the username -> id mapping is cached for
+    # long; unknown usernames are cached as missing like profiles are.
+    entries = cache_get_many(
+        [public_username_key(username) for username in usernames],
+        settings.PUBLIC_PROFILE_LOCAL_CACHE_TTL_SECONDS,
+    )
+    user_ids = {}
+    unresolved = []
+    for username, entry in zip(usernames, entries):
+        if entry is None:
+            unresolved.append(username)
+        elif "user_id" in entry:
+            user_ids[username] = entry["user_id"]
+
+    if unresolved:
+        found = dict(db.query(User.username, User.id).filter(User.username.in_(unresolved)).all())
+        user_ids.update(found)
+        cache_set_many(
+            {public_username_key(username): {"user_id": user_id} for username, user_id in found.items()},
+            settings.PUBLIC_USERNAME_ID_CACHE_TTL_SECONDS,
+        )
+        cache_set_many(
+            {public_username_key(username): {"missing": True} for username in unresolved if username not in found},
+            settings.PUBLIC_PROFILE_NEGATIVE_CACHE_TTL_SECONDS,
+        )
+    return user_ids
+
+
+def _public_profile_cache_keys(db: Session, usernames: list[str]) -> dict[str, str]:
+    """Cache key of the current generation of each existing username."""
+    user_ids = _resolve_public_user_ids(db, usernames)
+    generations = cache_get_generations(
+        [user_cache_generation_key(user_id) for user_id in user_ids.values()],
+        settings.PUBLIC_PROFILE_LOCAL_CACHE_TTL_SECONDS,
+    )
+    return {
+        username: public_profile_cache_key(username, generation)
+        for username, generation in zip(user_ids, generations)
+    }
+
+
+def _split_param(value: Optional[str]) -> list[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _parse_projection(sections: Optional[str], fields: Optional[str]) -> dict[str, tuple[str, ...]]:
+    requested_fields: dict[str, set[str]] = {}
+    for item in _split_param(fields):
+        section, _, field = item.partition(".")
+        if section not in PUBLIC_SECTIONS or field not in PUBLIC_SECTIONS[section][1]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field: {item}"
+            )
+        requested_fields.setdefault(section, set()).add(field)
+
+    requested_sections = set(_split_param(sections) or requested_fields or PUBLIC_SECTIONS)
+    unknown = (requested_sections - set(PUBLIC_SECTIONS)) | (set(requested_fields) - requested_sections)
+    if unknown:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Profile not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown or unrequested section: {', '.join(sorted(unknown))}"
         )
 
-    projects = db.query(Project).filter(
-        Project.user_id == user.id,
-        Project.is_deleted == False,
-        Project.is_active == True,
-    ).order_by(Project.is_featured.desc(), Project.id.desc()).all()
-
-    skills = db.query(Skill).filter(
-        Skill.user_id == user.id,
-        Skill.is_deleted == False,
-        Skill.is_active == True,
-    ).order_by(Skill.name.asc()).all()
-
-    experiences = db.query(Experience).filter(
-        Experience.user_id == user.id,
-        Experience.is_deleted == False,
-        Experience.is_active == True,
-    ).order_by(Experience.start_date.desc(), Experience.id.desc()).all()
-
-    response = {
-        "name": user.name,
-        "username": user.username,
-        "projects": [
-            {
-                "title": item.title,
-                "description": item.description,
-                "repo_url": item.repo_url,
-                "live_url": item.live_url,
-                "start_date": item.start_date,
-                "end_date": item.end_date,
-                "is_featured": item.is_featured,
-            }
-            for item in projects
-        ],
-        "skills": [
-            {
-                "name": item.name,
-                "category": item.category,
-                "level": item.level,
-            }
-            for item in skills
-        ],
-        "experiences": [
-            {
-                "company": item.company,
-                "role_title": item.role_title,
-                "description": item.description,
-                "start_date": item.start_date,
-                "end_date": item.end_date,
-                "is_current": item.is_current,
-            }
-            for item in experiences
-        ],
+    # Canonical order, so equivalent projections share a cache key.
+    return {
+        section: tuple(
+            field for field in section_fields
+            if section not in requested_fields or field in requested_fields[section]
+        )
+        for section, (_, section_fields, _) in PUBLIC_SECTIONS.items()
+        if section in requested_sections
     }
 
-    cache_set_json(cache_key, response, settings.PUBLIC_PROFILE_CACHE_TTL_SECONDS)
-    return response
+
+def _encode_cursor(section: str, values: list) -> str:
+    raw = json.dumps([section, values], default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursors(cursors: Optional[list[str]]) -> dict[str, list]:
+    positions = {}
+    for cursor in cursors or []:
+        try:
+            section, values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            keys = PUBLIC_SECTION_KEYS[section]
+            if len(values) != len(keys):
+                raise ValueError(cursor)
+            values = [
+                date.fromisoformat(value) if isinstance(column.type, Date) else value
+                for value, (column, _) in zip(values, keys)
+            ]
+        except (ValueError, TypeError, KeyError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        positions[section] = values
+    return positions
+
+
+def _after_position(keys, values):
+    # Rows strictly after `values` in the (mixed direction) key order.
+    bound = [literal(value, column.type) for value, (column, _) in zip(values, keys)]
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        beyond = column < bound[index] if descending else column > bound[index]
+        clauses.append(and_(*[keys[prior][0] == bound[prior] for prior in range(index)], beyond))
+    return or_(*clauses)
+
+
+def _load_public_profile_view(
+    db: Session,
+    username: str,
+    projection: dict[str, tuple[str, ...]],
+    limit: Optional[int],
+    positions: dict[str, list],
+) -> Optional[dict]:
+    user = db.query(User.id, User.name, User.username).filter(*_public_user_filters([username])).first()
+    if not user:
+        return None
+
+    view = {"name": user.name, "username": user.username}
+    next_cursors = {}
+    for section, fields in projection.items():
+        model = PUBLIC_SECTIONS[section][0]
+        keys = PUBLIC_SECTION_KEYS[section]
+        # Only the projected columns, plus the keyset columns for the cursor.
+        columns = [getattr(model, field) for field in fields]
+        columns += [column for column, _ in keys if column.key not in fields]
+
+        query = db.query(*columns).filter(
+            model.user_id == user.id,
+            model.is_deleted == False,
+            model.is_active == True,
+        )
+        if section in positions:
+            query = query.filter(_after_position(keys, positions[section]))
+        query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+        if limit:
+            query = query.limit(limit + 1)
+        rows = query.all()
+
+        has_more = bool(limit) and len(rows) > limit
+        rows = rows[:limit] if limit else rows
+        view[section] = [{field: getattr(row, field) for field in fields} for row in rows]
+        next_cursors[section] = (
+            _encode_cursor(section, [getattr(rows[-1], column.key) for column, _ in keys]) if has_more else None
+        )
+
+    if limit:
+        view["next_cursors"] = next_cursors
+    return view
+
+
+def get_public_profile_view_entry(
+    db: Session,
+    username: str,
+    sections: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursors: Optional[list[str]] = None,
+) -> dict:
+    """
+    Like get_public_profile_entry for a projection of the profile: only
+    the requested sections/fields, `limit` items per section starting
+    after the given per-section cursors. Cached per projection.
+    """
+    username = _canonical_username(username)
+    projection = _parse_projection(sections, fields)
+    positions = _decode_cursors(cursors)
+    if not _username_may_exist(username):
+        _raise_profile_not_found()
+    profile_key = _public_profile_cache_keys(db, [username]).get(username)
+    if profile_key is None:
+        _raise_profile_not_found()
+
+    spec = json.dumps([projection, limit, positions], default=str, sort_keys=True, separators=(",", ":"))
+    cache_key = f"{profile_key}:view:{hashlib.sha256(spec.encode('utf-8')).hexdigest()[:16]}"
+    entry = cache_get_json(cache_key)
+    if entry and "body" in entry:
+        return entry
+
+    view = _load_public_profile_view(db, username, projection, limit, positions)
+    if view is None:
+        _raise_profile_not_found()
+
+    body = json.dumps(view, default=str, separators=(",", ":"))
+    entry = {
+        "fresh_until": time.time() + settings.PUBLIC_PROFILE_CACHE_TTL_SECONDS,
+        "etag": public_profile_etag(body),
+        "body": body,
+    }
+    cache_set_json(cache_key, entry, settings.PUBLIC_PROFILE_CACHE_TTL_SECONDS)
+    return entry
+
+
+def get_public_profiles_batch(db: Session, usernames: list[str]) -> tuple[dict[str, str], list[str]]:
+    """
+    Resolve many public profiles at once. Returns the serialized body per
+    found username and the usernames that do not exist, both lowercased.
+
+    Cache hits come from multi-gets; misses are read from snapshots,
+    then built, with set-based `username IN (...)` queries.
+    """
+    usernames = list(dict.fromkeys(_canonical_username(username) for username in usernames if username))
+    bodies: dict[str, str] = {}
+    candidates = [username for username in usernames if _username_may_exist(username)]
+    keys = _public_profile_cache_keys(db, candidates) if candidates else {}
+    missing = [username for username in usernames if username not in keys]
+
+    entries = cache_get_many(list(keys.values()), settings.PUBLIC_PROFILE_LOCAL_CACHE_TTL_SECONDS)
+    misses: list[str] = []
+    for (username, cache_key), entry in zip(keys.items(), entries):
+        if entry and entry.get("missing"):
+            missing.append(username)
+        elif entry and "body" in entry:
+            if entry["fresh_until"] <= time.time():
+                _schedule_refresh(username, cache_key)
+            bodies[username] = entry["body"]
+        else:
+            misses.append(username)
+
+    if misses:
+        built = _cache_public_profiles(db, {username: keys[username] for username in misses})
+        bodies.update(built)
+        missing += [username for username in misses if username not in built]
+
+    for username in bodies:
+        _record_hit(username)
+    ordered = {username: bodies[username] for username in usernames if username in bodies}
+    return ordered, [username for username in usernames if username in missing]
+
+
+def warm_public_profiles_batch(usernames: list[str]) -> int:
+    """
+    Build and cache the public profiles of `usernames` that have no fresh
+    entry, with multi-key cache calls and set-based queries. Uses its own
+    session. Returns how many of the profiles exist.
+    """
+    usernames = list(dict.fromkeys(_canonical_username(username) for username in usernames))
+    db = sessiolocal()
+    try:
+        keys = _public_profile_cache_keys(db, usernames)
+        entries = cache_get_many(list(keys.values()))
+        now = time.time()
+        stale = {
+            username: cache_key
+            for (username, cache_key), entry in zip(keys.items(), entries)
+            if not (entry and "body" in entry and entry["fresh_until"] > now)
+        }
+        built = _cache_public_profiles(db, stale) if stale else {}
+        return len(keys) - len(stale) + len(built)
+    finally:
+        db.close()
+
+
+def get_public_profile(db: Session, username: str):
+    return json.loads(get_public_profile_entry(db, username)["body"])
@@ -4,7 +4,13 @@ import re
 from typing import Optional
 
 from app.models.users import User, UserRole
+from app.core.deps import invalidate_principal_cache
 from app.core.security import password_hash, verify_password
+from app.services.public_service import (
+    invalidate_public_profile_cache,
+    rebuild_public_profile_snapshot,
+    register_public_username,
+)
 from app.services.username_service import generate_unique_username, normalize_username_seed
 
 
@@ -64,6 +70,7 @@ def update_user_role(db: Session, user_id: int, role: str) -> User:
     user.role = role
     db.commit()
     db.refresh(user)
+    invalidate_principal_cache(user.id)
     return user
 
 
@@ -115,6 +122,7 @@ def create_user_by_admin(
     db.add(user)
     db.commit()
     db.refresh(user)
+    register_public_username(user.username)
     return user
 
 
@@ -129,8 +137,12 @@ def disable_user(db: Session, user_id: int, admin_user_id: int) -> User:
 
     user.is_active = False
     user.modify_by = admin_user_id
+    db.flush()
+    rebuild_public_profile_snapshot(db, user.id)
     db.commit()
     db.refresh(user)
+    # Bumps the user's generation, which also orphans the cached principal.
+    invalidate_public_profile_cache(user.id)
     return user
 
 
@@ -139,8 +151,12 @@ def enable_user(db: Session, user_id: int, admin_user_id: int) -> User:
 
     user.is_active = True
     user.modify_by = admin_user_id
+    db.flush()
+    rebuild_public_profile_snapshot(db, user.id)
     db.commit()
     db.refresh(user)
+    # Bumps the user's generation, which also orphans the cached principal.
+    invalidate_public_profile_cache(user.id)
     return user
 
 
@@ -177,3 +193,4 @@ def change_password(db: Session, user: User, old_password: str, new_password: st
 
     user.password_hash = password_hash(new_password)
     db.commit()
+    invalidate_principal_cache(user.id)
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis_client import cache_acquire_lock
+from app.services.public_service import flush_public_profile_hits, top_public_usernames, warm_public_profiles_batch
+
+WARMUP_LOCK_KEY = "lock:public_profile_warmup"
+WARMUP_BATCH_SIZE = 50
+
+
+def warmup_candidates(top_n: int) -> list[str]:
+    """Configured usernames first, then the most requested ones."""
+    usernames = [username.lower() for username in settings.PUBLIC_PROFILE_WARMUP_USERNAMES]
+    usernames += top_public_usernames(top_n)
+    return list(dict.fromkeys(usernames))[:top_n]
+
+
+def warm_public_profiles(usernames: list[str], concurrency: int) -> dict:
+    # Each batch holds one pooled DB connection, so `concurrency` bounds
+    # how much of the pool in app/db/session.py the warm-up can take.
+    batches = [usernames[i:i + WARMUP_BATCH_SIZE] for i in range(0, len(usernames), WARMUP_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="public-profile-warmup") as executor:
+        warmed = sum(executor.map(warm_public_profiles_batch, batches))
+    return {"requested": len(usernames), "warmed": warmed, "missing": len(usernames) - warmed}
+
+
+def run_public_profile_warmup(top_n: Optional[int] = None, concurrency: Optional[int] = None) -> dict:
+    usernames = warmup_candidates(top_n or settings.PUBLIC_PROFILE_WARMUP_TOP_N)
+    return warm_public_profiles(usernames, concurrency or settings.PUBLIC_PROFILE_WARMUP_CONCURRENCY)
+
+
+def _scheduled_warmup() -> None:
+    # One worker per interval warms the shared cache; the lock is left to
+    # expire rather than released.
+    lock_seconds = max(settings.PUBLIC_PROFILE_WARMUP_INTERVAL_SECONDS, 60)
+    if cache_acquire_lock(WARMUP_LOCK_KEY, lock_seconds) is None:
+        return
+    run_public_profile_warmup()
+
+
+async def public_profile_maintenance_loop() -> None:
+    """
+    Flush hit counts every PUBLIC_PROFILE_HITS_FLUSH_SECONDS and warm the
+    hottest profiles at startup and every PUBLIC_PROFILE_WARMUP_INTERVAL_SECONDS.
+    """
+    if settings.PUBLIC_PROFILE_WARMUP_ON_STARTUP:
+        try:
+            await asyncio.to_thread(_scheduled_warmup)
+        except Exception:
+            pass
+    last_warmup = time.monotonic()
+
+    while True:
+        await asyncio.sleep(settings.PUBLIC_PROFILE_HITS_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(flush_public_profile_hits)
+            interval = settings.PUBLIC_PROFILE_WARMUP_INTERVAL_SECONDS
+            if interval and time.monotonic() - last_warmup >= interval:
+                last_warmup = time.monotonic()
+                await asyncio.to_thread(_scheduled_warmup)
+        except Exception:
+            # Maintenance must never take the app down; retry next tick.
+            pass
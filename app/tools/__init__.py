@@ -0,0 +1,2 @@
+# Register every mapper, as the tools run outside the app.
+from app.db import models
@@ -0,0 +1,94 @@
+import argparse
+import json
+import time
+
+from sqlalchemy import func
+
+from app.core.redis_client import (
+    CODEC_COMPRESSIONS,
+    CODEC_SERIALIZERS,
+    decode_cache_value,
+    encode_cache_value,
+    msgpack,
+    orjson,
+    zstandard,
+)
+from app.db.session import sessiolocal
+from app.models.public_profile_snapshots import PublicProfileSnapshot
+from app.services.public_service import public_profile_etag, render_public_profile_body
+
+
+def _load_payloads(usernames: list[str], sample: int) -> dict[str, list]:
+    db = sessiolocal()
+    try:
+        query = db.query(PublicProfileSnapshot.document)
+        if usernames:
+            query = query.filter(PublicProfileSnapshot.username.in_(usernames))
+        else:
+            # The largest profiles are the ones the codec matters for.
+            query = query.order_by(func.length(PublicProfileSnapshot.document).desc()).limit(sample)
+        documents = [document for (document,) in query]
+    finally:
+        db.close()
+
+    entries = []
+    for document in documents:
+        body = render_public_profile_body(document)
+        entries.append({"fresh_until": time.time(), "etag": public_profile_etag(body), "body": body})
+    # `entry` is what the public profile cache stores; `document` is the
+    # same profile as a structured value.
+    return {"entry": entries, "document": [json.loads(document) for document in documents]}
+
+
+def _codecs() -> list[tuple[str, str]]:
+    available = {"json": True, "orjson": orjson is not None, "msgpack": msgpack is not None}
+    compressions = {"none": True, "zlib": True, "zstd": zstandard is not None}
+    return [
+        (serializer, compression)
+        for serializer in CODEC_SERIALIZERS if available[serializer]
+        for compression in CODEC_COMPRESSIONS if compressions[compression]
+    ]
+
+
+def _measure(values: list, serializer: str, compression: str, rounds: int) -> tuple[int, float, float]:
+    encoded = [encode_cache_value(value, serializer, compression) for value in values]
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for value in values:
+            encode_cache_value(value, serializer, compression)
+    encode_us = (time.perf_counter() - started) / (rounds * len(values)) * 1_000_000
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for raw in encoded:
+            decode_cache_value(raw)
+    decode_us = (time.perf_counter() - started) / (rounds * len(values)) * 1_000_000
+
+    return sum(len(raw) for raw in encoded), encode_us, decode_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare cache codecs on stored public profiles.")
+    parser.add_argument("usernames", nargs="*", help="benchmark these profiles instead of the largest ones")
+    parser.add_argument("--sample", type=int, default=50, help="number of largest profiles to use")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = _load_payloads(args.usernames, args.sample)
+    if not payloads["entry"]:
+        print("no public profile snapshots to benchmark")
+        return
+
+    for name, values in payloads.items():
+        legacy = sum(len(json.dumps(value, default=str).encode("utf-8")) for value in values)
+        print(f"\n{name}: {len(values)} profiles, {legacy} bytes as plain JSON")
+        print(f"{'codec':<18}{'bytes':>10}{'ratio':>8}{'encode us':>12}{'decode us':>12}")
+        for serializer, compression in _codecs():
+            size, encode_us, decode_us = _measure(values, serializer, compression, args.rounds)
+            codec = f"{serializer}+{compression}"
+            print(f"{codec:<18}{size:>10}{size / legacy:>8.2f}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
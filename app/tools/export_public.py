@@ -0,0 +1,124 @@
+import argparse
+import gzip
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import sessiolocal
+from app.models.public_profile_snapshots import PublicProfileSnapshot
+from app.models.users import User
+from app.services.public_service import load_public_profile_documents, render_public_profile_body
+
+STATE_FILE = ".export_state.json"
+CHUNK_SIZE = 500
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _write_profile(out_dir: Path, username: str, body: str) -> None:
+    data = body.encode("utf-8")
+    _write_atomic(out_dir / f"{username}.json", data)
+    # mtime=0 keeps the archive identical when the profile is unchanged.
+    _write_atomic(out_dir / f"{username}.json.gz", gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def _remove_profile(out_dir: Path, username: str) -> None:
+    for suffix in (".json", ".json.gz"):
+        (out_dir / f"{username}{suffix}").unlink(missing_ok=True)
+
+
+def _read_state(out_dir: Path) -> Optional[datetime]:
+    path = out_dir / STATE_FILE
+    if not path.exists():
+        return None
+    return datetime.fromisoformat(json.loads(path.read_text())["started_at"])
+
+
+def _export_chunk(db: Session, out_dir: Path, usernames: list[str]) -> int:
+    documents = load_public_profile_documents(db, usernames)
+    for username, document in documents.items():
+        _write_profile(out_dir, username, render_public_profile_body(document))
+    return len(documents)
+
+
+def export_public_profiles(out_dir: Path, since: Optional[datetime] = None) -> dict:
+    """
+    Write `<username>.json` and `<username>.json.gz` for every public
+    profile. With `since`, only users whose profile changed after it are
+    rewritten, and users disabled or deleted since then are removed.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.utcnow()
+    exported = removed = 0
+    seen: set[str] = set()
+
+    db = sessiolocal()
+    try:
+        query = db.query(User.username, User.is_active, User.is_deleted)
+        if since is not None:
+            query = query.outerjoin(PublicProfileSnapshot, PublicProfileSnapshot.user_id == User.id).filter(or_(
+                User.created_at > since,
+                User.modify_at > since,
+                PublicProfileSnapshot.updated_at > since,
+            ))
+        else:
+            query = query.filter(User.is_active == True, User.is_deleted == False)
+
+        # yield_per streams rows through a server-side cursor.
+        chunk: list[str] = []
+        for username, is_active, is_deleted in query.order_by(User.id).yield_per(CHUNK_SIZE):
+            if not is_active or is_deleted:
+                _remove_profile(out_dir, username)
+                removed += 1
+                continue
+            chunk.append(username)
+            if len(chunk) >= CHUNK_SIZE:
+                exported += _export_chunk(db, out_dir, chunk)
+                seen.update(chunk)
+                chunk = []
+        if chunk:
+            exported += _export_chunk(db, out_dir, chunk)
+            seen.update(chunk)
+    finally:
+        db.close()
+
+    if since is None:
+        # A full export also drops files of users that no longer exist.
+        # Profile files are never hidden; the state file is.
+        for path in out_dir.glob("[!.]*.json"):
+            if path.stem not in seen:
+                _remove_profile(out_dir, path.stem)
+                removed += 1
+
+    _write_atomic(out_dir / STATE_FILE, json.dumps({"started_at": started_at.isoformat()}).encode("utf-8"))
+    return {"exported": exported, "removed": removed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export public profiles as static, pre-compressed JSON files.")
+    parser.add_argument("--out", default=settings.PUBLIC_EXPORT_DIR, help="output directory served by nginx")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-export profiles changed since the previous run",
+    )
+    args = parser.parse_args()
+
+    out_dir = Path(args.out)
+    since = _read_state(out_dir) if args.incremental else None
+    result = export_public_profiles(out_dir, since)
+    print(f"exported={result['exported']} removed={result['removed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import argparse
+
+from app.core.config import settings
+from app.services.warmup_service import run_public_profile_warmup, warm_public_profiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-build the public profile cache.")
+    parser.add_argument("usernames", nargs="*", help="warm these usernames instead of the ranked list")
+    parser.add_argument("--top", type=int, default=settings.PUBLIC_PROFILE_WARMUP_TOP_N)
+    parser.add_argument("--concurrency", type=int, default=settings.PUBLIC_PROFILE_WARMUP_CONCURRENCY)
+    args = parser.parse_args()
+
+    if args.usernames:
+        result = warm_public_profiles(args.usernames, args.concurrency)
+    else:
+        result = run_public_profile_warmup(args.top, args.concurrency)
+    print(f"requested={result['requested']} warmed={result['warmed']} missing={result['missing']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from app.routers import auth, portfolio, public, users
+from app.core.redis_client import (
+    close_async_redis_client,
+    start_cache_listener,
+    start_memory_sweeper,
+    stop_cache_listener,
+    stop_memory_sweeper,
+)
+from app.routers import auth, metrics, portfolio, public, users
+from app.services.public_service import flush_public_profile_hits, start_username_filter
+from app.services.warmup_service import public_profile_maintenance_loop
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_cache_listener()
+    start_memory_sweeper()
+    start_username_filter()
+    maintenance = asyncio.create_task(public_profile_maintenance_loop())
+    yield
+    maintenance.cancel()
+    with suppress(asyncio.CancelledError):
+        await maintenance
+    flush_public_profile_hits()
+    stop_memory_sweeper()
+    stop_cache_listener()
+    await close_async_redis_client()
+
 
 app = FastAPI(
     title='portfolio_app',
     version="1.0.0",
-    root_path="/api"
+    root_path="/api",
+    lifespan=lifespan,
     )
 
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(portfolio.router)
 app.include_router(public.router)
+app.include_router(metrics.router)
 
 
 
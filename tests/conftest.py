@@ -0,0 +1,77 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Settings are read at import time: point the app at a throwaway SQLite
+# database and an unreachable Redis, so caches use the memory fallback.
+_db_dir = tempfile.mkdtemp(prefix="portfolio_api_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.sqlite")
+os.environ.setdefault("PUBLIC_BASE_URL", "http://testserver")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core import redis_client
+from app.core.memory_cache import MemoryCache
+from app.core.config import settings
+from app.db import models  # noqa: F401  registers every mapper
+from app.db.base import Base
+from app.db.session import engine, sessiolocal
+
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(engine)
+    import main
+
+    # Without the lifespan: no cache listener or warmup threads in tests.
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def db():
+    session = sessiolocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def cold_cache(monkeypatch):
+    """Start the test with empty L1, memory and generation caches."""
+    monkeypatch.setattr(
+        redis_client,
+        "_memory_cache",
+        MemoryCache(settings.MEMORY_CACHE_MAX_ENTRIES, settings.MEMORY_CACHE_MAX_BYTES),
+    )
+    monkeypatch.setattr(redis_client, "_memory_generations", {})
+    with redis_client._local_lock:
+        redis_client._local_cache.clear()
+
+
+def register(client, name: str, email: str, password: str = "Passw0rd!x") -> dict:
+    """Register and log in a user; returns the Authorization header."""
+    response = client.post("/auth/register", json={"name": name, "email_id": email, "password": password})
+    assert response.status_code == 201, response.text
+    response = client.post("/auth/login", json={"email_id": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@contextmanager
+def count_statements(bind):
+    """Collect the SQL statements executed on `bind` inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
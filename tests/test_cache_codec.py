@@ -0,0 +1,20 @@
+import pytest
+
+from app.core import redis_client
+from app.core.redis_client import cache_get_json, cache_set_json, encode_cache_value
+
+VALUE = {"username": "codec", "projects": [{"title": "Project"} for _ in range(200)]}
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+def test_truncated_entries_read_as_misses(cold_cache, serializer, compression):
+    raw = encode_cache_value(VALUE, serializer, compression)
+    for corrupt in (raw[: len(raw) // 2], raw[:1], b""):
+        redis_client._memory_cache.set("codec:corrupt", corrupt, 60)
+        assert cache_get_json("codec:corrupt") is None
+
+
+def test_entries_round_trip(cold_cache):
+    cache_set_json("codec:ok", VALUE, 60)
+    assert cache_get_json("codec:ok") == VALUE
@@ -0,0 +1,38 @@
+from app.core import deps
+from app.core.config import settings
+from app.core.redis_client import cache_get_generations, cache_set_json
+from app.services import user_service
+from tests.conftest import register
+
+
+def _principal_key(user_id: int) -> str:
+    generation = cache_get_generations([deps.user_cache_generation_key(user_id)])[0]
+    return deps.principal_cache_key(user_id, generation)
+
+
+def test_disable_is_not_undone_by_a_snapshot_read_before_it(client, db, cold_cache):
+    headers = register(client, "Racing Reader", "racing.reader@example.com")
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+
+    # A request missed the cache and read the row while it was still active...
+    stale_key = _principal_key(user_id)
+    stale = {"id": user_id, "role": "user", "is_active": True, "is_deleted": False}
+
+    user_service.disable_user(db, user_id, admin_user_id=0)
+    # ...and stores its snapshot only after the disable committed.
+    cache_set_json(stale_key, stale, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+    assert _principal_key(user_id) != stale_key
+    assert client.get("/users/me", headers=headers).status_code == 403
+
+    user_service.enable_user(db, user_id, admin_user_id=0)
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+
+def test_role_change_applies_to_the_next_request(client, db, cold_cache):
+    headers = register(client, "Promoted User", "promoted.user@example.com")
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    assert client.get("/users", headers=headers).status_code == 403
+
+    user_service.update_user_role(db, user_id, "admin")
+    assert client.get("/users", headers=headers).status_code == 200
@@ -0,0 +1,129 @@
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.session import engine
+from app.models.portfolio import Experience, Project, Skill
+from app.models.public_profile_snapshots import PublicProfileSnapshot
+from app.models.users import User
+from app.schemas.public import PublicProfileResponse
+from app.services import public_service
+from app.services.public_service import (
+    _load_public_profiles_multi_query,
+    _load_public_profiles_single_query,
+)
+from tests.conftest import count_statements, register
+
+
+def _create_profile(client, name: str, email: str, items: int = 1) -> str:
+    headers = register(client, name, email)
+    for index in range(items):
+        client.post("/portfolio/projects", json={"title": f"Project {index}", "is_featured": index == 0}, headers=headers)
+        client.post("/portfolio/skills", json={"name": f"Skill {index}", "level": "expert"}, headers=headers)
+        client.post(
+            "/portfolio/experiences",
+            json={"company": f"Company {index}", "role_title": "Engineer", "start_date": "2020-01-01"},
+            headers=headers,
+        )
+    return client.get("/users/me", headers=headers).json()["username"]
+
+
+def test_cold_cache_profile_reads_the_snapshot(client, cold_cache):
+    username = _create_profile(client, "Snapshot Reader", "snapshot.reader@example.com")
+
+    with count_statements(engine) as statements:
+        response = client.get(f"/public/{username}")
+    assert response.status_code == 200
+    assert len(response.json()["projects"]) == 1
+    # username -> id, then the pre-rendered snapshot by primary key.
+    assert len(statements) == 2
+
+    with count_statements(engine) as statements:
+        assert client.get(f"/public/{username}").status_code == 200
+    assert statements == []
+
+
+def _cold_build_statements(client, db, username: str) -> list[str]:
+    db.query(PublicProfileSnapshot).filter(PublicProfileSnapshot.username == username).delete()
+    db.commit()
+    with count_statements(engine) as statements:
+        assert client.get(f"/public/{username}").status_code == 200
+    return statements
+
+
+def test_cold_cache_profile_without_snapshot_does_not_query_per_item(client, db, cold_cache):
+    small = _create_profile(client, "Small Profile", "small.profile@example.com", items=1)
+    large = _create_profile(client, "Large Profile", "large.profile@example.com", items=5)
+
+    small_statements = _cold_build_statements(client, db, small)
+    large_statements = _cold_build_statements(client, db, large)
+    assert len(small_statements) == len(large_statements)
+    assert len(client.get(f"/public/{large}").json()["skills"]) == 5
+
+    with count_statements(engine) as statements:
+        assert client.get(f"/public/{large}").status_code == 200
+    assert statements == []
+
+
+def test_single_query_loader_is_one_statement():
+    captured = []
+
+    class _Session:
+        def execute(self, statement):
+            captured.append(statement)
+            return self
+
+        def mappings(self):
+            return []
+
+    assert _load_public_profiles_single_query(_Session(), ["alice"]) == {}
+    assert len(captured) == 1
+    sql = str(captured[0].compile(dialect=postgresql.dialect()))
+    assert sql.count("json_agg") == len(public_service.PUBLIC_SECTIONS)
+
+
+@pytest.fixture
+def postgres_session():
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pg_engine = create_engine(url)
+    Base.metadata.create_all(pg_engine)
+    session = sessionmaker(bind=pg_engine)()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        Base.metadata.drop_all(pg_engine)
+        pg_engine.dispose()
+
+
+def test_single_and_multi_query_loaders_agree(postgres_session):
+    db = postgres_session
+    user = User(name="Pat", username="pat", email_id="pat@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    db.add_all([
+        Project(user_id=user.id, title="One", is_featured=False),
+        Project(user_id=user.id, title="Two", is_featured=True, start_date=date(2021, 5, 1)),
+        Project(user_id=user.id, title="Gone", is_deleted=True),
+        Skill(user_id=user.id, name="SQL"),
+        Skill(user_id=user.id, name="Go", level="basic"),
+        Experience(user_id=user.id, company="Acme", role_title="Dev", start_date=date(2019, 1, 1)),
+        Experience(user_id=user.id, company="Beta", role_title="Lead", start_date=date(2022, 3, 1), is_current=True),
+    ])
+    db.flush()
+
+    single = _load_public_profiles_single_query(db, ["pat"])
+    multi = _load_public_profiles_multi_query(db, ["pat"])
+    assert set(single) == set(multi) == {"pat"}
+    assert (
+        PublicProfileResponse.model_validate(single["pat"]).model_dump()
+        == PublicProfileResponse.model_validate(multi["pat"]).model_dump()
+    )
@@ -0,0 +1,28 @@
+from app.schemas.public import PublicProfileViewResponse
+from tests.conftest import register
+
+
+def test_openapi_documents_profile_views(client):
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/public/{username}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    refs = {option["$ref"].rsplit("/", 1)[-1] for option in ok["anyOf"]}
+    assert refs == {"PublicProfileResponse", "PublicProfileViewResponse"}
+    assert "next_cursors" in schema["components"]["schemas"]["PublicProfileViewResponse"]["properties"]
+
+
+def test_paginated_view_matches_the_view_schema(client, cold_cache):
+    headers = register(client, "View Reader", "view.reader@example.com")
+    for index in range(3):
+        client.post("/portfolio/skills", json={"name": f"Skill {index}"}, headers=headers)
+    username = client.get("/users/me", headers=headers).json()["username"]
+
+    response = client.get(f"/public/{username}", params={"sections": "skills", "fields": "skills.name", "limit": 2})
+    assert response.status_code == 200
+    view = PublicProfileViewResponse.model_validate(response.json())
+    assert view.projects is None and len(view.skills) == 2
+    assert view.skills[0].level is None
+    assert view.next_cursors["skills"]
+
+    response = client.get(f"/public/{username}", params={"sections": "skills", "limit": 2, "cursor": view.next_cursors["skills"]})
+    last_page = PublicProfileViewResponse.model_validate(response.json())
+    assert len(last_page.skills) == 1 and last_page.next_cursors["skills"] is None
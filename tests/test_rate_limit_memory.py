@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import _MemoryCounters, _hit_with_memory
+
+THREADS = 16
+HITS_PER_THREAD = 500
+
+
+@pytest.fixture
+def memory_limiter(monkeypatch):
+    # The per-process table only, with no shared store.
+    counters = _MemoryCounters(settings.RATE_LIMIT_MEMORY_MAX_KEYS, settings.RATE_LIMIT_MEMORY_LOCK_STRIPES)
+    monkeypatch.setattr(rate_limit, "get_shared_store", lambda: None)
+    monkeypatch.setattr(rate_limit, "_memory_counters", counters)
+    return counters
+
+
+def _hammer(hit, hits_per_thread: int = HITS_PER_THREAD) -> list:
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        batches = executor.map(lambda _: [hit() for _ in range(hits_per_thread)], range(THREADS))
+        return [result for batch in batches for result in batch]
+
+
+def test_counts_stay_exact_under_parallel_updates():
+    counters = _MemoryCounters(max_keys=1000, stripes=8)
+
+    def increment():
+        return counters.update("client", lambda state: ((state or 0) + 1, 60.0, None), 0.0)
+
+    _hammer(increment)
+    final = counters.update("client", lambda state: (state, 60.0, state), 0.0)
+    assert final == THREADS * HITS_PER_THREAD
+
+
+@pytest.mark.parametrize("algorithm", rate_limit.ALGORITHMS)
+def test_exactly_the_limit_is_admitted_under_parallel_hits(memory_limiter, algorithm):
+    limit = 1000
+    results = _hammer(lambda: _hit_with_memory(algorithm, f"rl:test:{algorithm}:ip", limit, 3600))
+
+    assert len(results) == THREADS * HITS_PER_THREAD
+    assert sum(allowed for allowed, _, _ in results) == limit
+
+
+def test_fixed_window_counts_every_parallel_hit(memory_limiter):
+    limit = THREADS * HITS_PER_THREAD
+    results = _hammer(lambda: _hit_with_memory("fixed_window", "rl:test:count:ip", limit, 3600))
+
+    assert all(allowed for allowed, _, _ in results)
+    assert sorted(remaining for _, remaining, _ in results) == list(range(limit))
+
+
+def test_table_is_bounded_by_max_keys():
+    counters = _MemoryCounters(max_keys=100, stripes=4)
+    for index in range(1000):
+        counters.update(f"ip-{index}", lambda state: (1, 60.0, None), 0.0)
+
+    assert len(counters) <= 100
+    # The most recent clients are the ones kept.
+    assert counters.update("ip-999", lambda state: (state, 60.0, state), 0.0) == 1
+
+
+def test_configured_bound_applies_to_the_module_table():
+    counters = rate_limit._memory_counters
+    assert counters.max_keys_per_stripe * len(counters.stripes) <= settings.RATE_LIMIT_MEMORY_MAX_KEYS
+
+
+def test_idle_keys_expire():
+    counters = _MemoryCounters(max_keys=1000, stripes=1)
+    for index in range(50):
+        counters.update(f"idle-{index}", lambda state: (1, 60.0, None), 0.0)
+    assert len(counters) == 50
+
+    # Past their TTL, idle entries are dropped by the next hit and their
+    # state is not handed to the step.
+    assert counters.update("idle-0", lambda state: (1, 60.0, state), 61.0) is None
+    assert len(counters) == 1
+
+
+@pytest.mark.parametrize("algorithm", rate_limit.ALGORITHMS)
+def test_a_hit_spends_its_whole_cost_or_nothing(memory_limiter, algorithm):
+    key = f"rl:test:cost:{algorithm}:ip"
+    assert _hit_with_memory(algorithm, key, 100, 3600, cost=60)[0]
+    assert not _hit_with_memory(algorithm, key, 100, 3600, cost=41)[0]
+    assert _hit_with_memory(algorithm, key, 100, 3600, cost=40)[0]
+    assert not _hit_with_memory(algorithm, key, 100, 3600)[0]
+
+
+def _batch(client, count: int):
+    return client.post("/public/batch", json={"usernames": [f"nobody-{index}" for index in range(count)]})
+
+
+def test_batch_spends_the_public_budget_per_profile(client, memory_limiter):
+    limit = settings.RATE_LIMIT_PUBLIC_REQUESTS
+    assert _batch(client, limit + 1).status_code == 429
+    assert _batch(client, limit - 1).status_code == 200
+    assert _batch(client, 2).status_code == 429
+    assert client.get("/public/nobody-0").status_code == 404
+    assert client.get("/public/nobody-0").status_code == 429
@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.config import settings
+from app.core.redis_client import host_generation
+from app.db.session import engine
+from app.services import public_service
+from tests.conftest import count_statements, register
+
+
+@pytest.fixture
+def single_host_filter(monkeypatch, cold_cache):
+    monkeypatch.setattr(settings, "PUBLIC_USERNAME_FILTER_SINGLE_HOST", True)
+    # Built synchronously instead of on the refresh executor.
+    monkeypatch.setattr(public_service, "_schedule_username_filter_rebuild", public_service.rebuild_username_filter)
+    monkeypatch.setattr(public_service, "_username_filter", None)
+    public_service.start_username_filter()
+    yield
+    monkeypatch.setattr(public_service, "_username_filter", None)
+
+
+def test_unknown_names_skip_the_database_without_redis(client, single_host_filter):
+    assert not public_service.cache_listener_connected()
+    with count_statements(engine) as statements:
+        assert client.get("/public/nobody-registered-this").status_code == 404
+    assert statements == []
+
+
+def test_names_registered_here_stay_visible(client, single_host_filter):
+    headers = register(client, "Filter Newcomer", "filter.newcomer@example.com")
+    username = client.get("/users/me", headers=headers).json()["username"]
+    assert public_service._username_may_exist(username)
+    assert client.get(f"/public/{username}").status_code == 200
+
+
+def test_a_registration_on_another_worker_rebuilds_the_filter(client, db, single_host_filter, monkeypatch):
+    rebuilds = []
+    monkeypatch.setattr(public_service, "_schedule_username_filter_rebuild", lambda: rebuilds.append(True))
+    # Another worker on the host: the shared counter moves, this filter does not.
+    host_generation(public_service.USERNAMES_ADDED_GENERATION_KEY, bump=True)
+
+    assert public_service._username_may_exist("registered-elsewhere")
+    assert rebuilds